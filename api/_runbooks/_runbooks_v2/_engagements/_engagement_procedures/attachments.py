@@ -1,4 +1,5 @@
 from utils import request_handler as request
+from utils import async_request_handler as async_request
 
 def runbookengagementprocedureattachmentlistv2(base_url, headers, payload):
     """
@@ -35,3 +36,39 @@ def runbookengagementprocedureattachmentdeletev2(base_url, headers, payload):
     root = ""
     path = "/graphql"
     return request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedureattachmentlistv2_async(base_url, headers, payload):
+    """
+    team can be one of "RED", "BLUE"
+    """
+    name = "RunbookEngagementProcedureAttachmentListV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def upload_attachment_to_engagement_procedure_async(base_url, headers, engagementProcedureId, payload):
+    """
+    REST endpoint to upload attachments to a RunbooksV2 Engagment Procedure
+    """
+    name = "Upload Attachment to Engagement Procedure"
+    root = "/api/v2"
+    path = f'/runbooks/engagement-procedures/{engagementProcedureId}/attachments/upload'
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedureattachmentsupdatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookEngagementProcedureAttachmentsUpdateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedureattachmentdeletev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookEngagementProcedureAttachmentDeleteV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
\ No newline at end of file
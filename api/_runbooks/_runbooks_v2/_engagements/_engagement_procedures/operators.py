@@ -1,4 +1,5 @@
 from utils import request_handler as request
+from utils import async_request_handler as async_request
 
 def runbookengagementprocedureoperatorlistv2(base_url, headers, payload):
     """
@@ -17,3 +18,21 @@ def runbookengagementprocedureoperatorsupdatev2(base_url, headers, payload):
     root = ""
     path = "/graphql"
     return request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedureoperatorlistv2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookEngagementProcedureOperatorListV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedureoperatorsupdatev2_async(base_url, headers, payload):
+    """
+    Assign a user as an operator to a procedure in a RunbookV2 engagement.
+    """
+    name = "RunbookEngagementProcedureOperatorsUpdateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from utils import request_handler as request
+from utils import async_request_handler as async_request
 
 def runbookengagementprocedurelogsv2(base_url, headers, payload):
     """
@@ -35,3 +36,39 @@ def runbookengagementprocedurelogdeletev2(base_url, headers, payload):
     root = ""
     path = "/graphql"
     return request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedurelogsv2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookEngagementProcedureLogsV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedurelogcreatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookEngagementProcedureLogCreateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedurelogupdatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookEngagementProcedureLogUpdateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedurelogdeletev2_async(base_url, headers, payload):
+    """
+    team can be one of "RED", "BLUE"
+    """
+    name = "RunbookEngagementProcedureLogDeleteV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from utils import request_handler as request
+from utils import async_request_handler as async_request
 
 def runbookengagementprocedureassetlistv2(base_url, headers, payload):
     """
@@ -44,3 +45,48 @@ def runbookengagementprocedureassetupdatev2(base_url, headers, payload):
     root = ""
     path = "/graphql"
     return request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedureassetlistv2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookEngagementProcedureAssetListV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedureassetsaddv2_async(base_url, headers, payload):
+    """
+    Add an existing asset to a procedure in a RunbookV2 engagement.
+    """
+    name = "RunbookEngagementProcedureAssetsAddV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedureassetcreatev2_async(base_url, headers, payload):
+    """
+    Create a new asset and add it to a procedure in a RunbookV2 engagement.
+    """
+    name = "RunbookEngagementProcedureAssetCreateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedureassetdeletev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookEngagementProcedureAssetDeleteV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedureassetupdatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookEngagementProcedureAssetUpdateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
\ No newline at end of file
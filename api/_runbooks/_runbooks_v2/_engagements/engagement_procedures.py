@@ -1,4 +1,5 @@
 from utils import request_handler as request
+from utils import async_request_handler as async_request
 
 def runbookengagementprocedureidsv2(base_url, headers, payload):
     """
@@ -44,3 +45,48 @@ def runbookengagementproceduredeletev2(base_url, headers, payload):
     root = ""
     path = "/graphql"
     return request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedureidsv2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookEngagementProcedureIdsV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedurelistv2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookEngagementProcedureListV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementproceduredetailv2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookEngagementProcedureDetailV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementprocedureupdatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookEngagementProcedureUpdateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookengagementproceduredeletev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookEngagementProcedureDeleteV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from utils import request_handler as request
+from utils import async_request_handler as async_request
 
 def runbookrepositoryavailableuserlistv2(base_url, headers, payload):
     """
@@ -46,3 +47,50 @@ def runbookrepositoryuserremovev2(base_url, headers, payload):
     root = ""
     path = "/graphql"
     return request.post(base_url, headers, root+path, name, payload)
+
+async def runbookrepositoryavailableuserlistv2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookRepositoryAvailableUserListV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookrepositoryusersv2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookRepositoryUsersV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookrepositoryusersaddv2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookRepositoryUsersAddV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookrepositoryuserupdatev2_async(base_url, headers, payload):
+    """
+    Can update the permission of a user in the RunbookDB Repository.
+
+`role` can be one of `["viewer", "editor"]`
+    """
+    name = "RunbookRepositoryUserUpdateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookrepositoryuserremovev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookRepositoryUserRemoveV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from utils import request_handler as request
+from utils import async_request_handler as async_request
 
 def runbookmethodologylistv2(base_url, headers, payload):
     """
@@ -44,3 +45,48 @@ def runbookmethodologydeletev2(base_url, headers, payload):
     root = ""
     path = "/graphql"
     return request.post(base_url, headers, root+path, name, payload)
+
+async def runbookmethodologylistv2_async(base_url, headers, payload):
+    """
+    Returns a list of Methodologies in the RunbooksDB
+    """
+    name = "RunbookMethodologyListV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookmethodologydetailv2_async(base_url, headers, payload):
+    """
+    Returns the data for a RunbooksV2 Methodology
+    """
+    name = "RunbookMethodologyDetailV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookmethodologycreatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookMethodologyCreateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookmethodologyupdatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookMethodologyUpdateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookmethodologydeletev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookMethodologyDeleteV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
\ No newline at end of file
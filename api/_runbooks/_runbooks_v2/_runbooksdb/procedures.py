@@ -1,4 +1,5 @@
 from utils import request_handler as request
+from utils import async_request_handler as async_request
 
 def runbookprocedurelistv2(base_url, headers, payload):
     """
@@ -44,3 +45,48 @@ def runbookproceduredeletev2(base_url, headers, payload):
     root = ""
     path = "/graphql"
     return request.post(base_url, headers, root+path, name, payload)
+
+async def runbookprocedurelistv2_async(base_url, headers, payload):
+    """
+    Returns a list of Procedures in the RunbooksDB
+    """
+    name = "RunbookProcedureListV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookproceduredetailv2_async(base_url, headers, payload):
+    """
+    Returns the data for a RunbooksV2 Procedure
+    """
+    name = "RunbookProcedureDetailV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookprocedurecreatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookProcedureCreateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookprocedureupdatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookProcedureUpdateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookproceduredeletev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookProcedureDeleteV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
\ No newline at end of file
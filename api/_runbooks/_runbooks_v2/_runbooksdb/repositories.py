@@ -1,4 +1,5 @@
 from utils import request_handler as request
+from utils import async_request_handler as async_request
 
 def runbookrepositorylistv2(base_url, headers, payload):
     """
@@ -48,3 +49,52 @@ def runbookrepositorydeletev2(base_url, headers, payload):
     root = ""
     path = "/graphql"
     return request.post(base_url, headers, root+path, name, payload)
+
+async def runbookrepositorylistv2_async(base_url, headers, payload):
+    """
+    Returns a list of all Repositories in the RunbooksDB
+    """
+    name = "RunbookRepositoryListV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookrepositorydetailv2_async(base_url, headers, payload):
+    """
+    Returns the data for a RunbooksV2 Repository and a list of Procedures it contains
+    """
+    name = "RunbookRepositoryDetailV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookrepositorycreatev2_async(base_url, headers, payload):
+    """
+    Create a RunbookDB Repository.
+
+Must have a unique `shortName` (`Repository ID Prefix` in platform)
+
+`type` can be one of `["private", "managed", "open"]`
+    """
+    name = "RunbookRepositoryCreateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookrepositoryupdatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookRepositoryUpdateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbookrepositorydeletev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookRepositoryDeleteV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
\ No newline at end of file
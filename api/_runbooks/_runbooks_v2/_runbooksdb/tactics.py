@@ -1,4 +1,5 @@
 from utils import request_handler as request
+from utils import async_request_handler as async_request
 
 def runbooktacticlistv2(base_url, headers, payload):
     """
@@ -44,3 +45,48 @@ def runbooktacticdeletev2(base_url, headers, payload):
     root = ""
     path = "/graphql"
     return request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktacticlistv2_async(base_url, headers, payload):
+    """
+    Returns a list of Tactics in the RunbooksDB
+    """
+    name = "RunbookTacticListV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktacticdetailv2_async(base_url, headers, payload):
+    """
+    Returns the data for a RunbooksV2 Tactic
+    """
+    name = "RunbookTacticDetailV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktacticcreatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookTacticCreateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktacticupdatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookTacticUpdateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktacticdeletev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookTacticDeleteV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from utils import request_handler as request
+from utils import async_request_handler as async_request
 
 def runbooktechniquelistv2(base_url, headers, payload):
     """
@@ -46,3 +47,50 @@ def runbooktechniquedeletev2(base_url, headers, payload):
     root = ""
     path = "/graphql"
     return request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktechniquelistv2_async(base_url, headers, payload):
+    """
+    StartFragment
+
+Returns a list of Techniques in the RunbooksDB
+    """
+    name = "RunbookTechniqueListV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktechniquedetailv2_async(base_url, headers, payload):
+    """
+    Returns the data for a RunbooksV2 Technique
+    """
+    name = "RunbookTechniqueDetailV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktechniquecreatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookTechniqueCreateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktechniqueupdatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookTechniqueUpdateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktechniquedeletev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookTechniqueDeleteV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
\ No newline at end of file
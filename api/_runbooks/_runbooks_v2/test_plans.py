@@ -1,4 +1,5 @@
 from utils import request_handler as request
+from utils import async_request_handler as async_request
 
 def runbooktestplanlistv2(base_url, headers, payload):
     """
@@ -44,3 +45,48 @@ def runbooktestplandeletev2(base_url, headers, payload):
     root = ""
     path = "/graphql"
     return request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktestplanlistv2_async(base_url, headers, payload):
+    """
+    Returns a list of RunbookV2 Test Plans
+    """
+    name = "RunbookTestPlanListV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktestplandetailv2_async(base_url, headers, payload):
+    """
+    Returns the data for a RunbooksV2 Test Plan and all Procedures it contains
+    """
+    name = "RunbookTestPlanDetailV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktestplancreatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookTestPlanCreateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktestplanupdatev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookTestPlanUpdateV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
+
+async def runbooktestplandeletev2_async(base_url, headers, payload):
+    """
+    No description in Postman
+    """
+    name = "RunbookTestPlanDeleteV2"
+    root = ""
+    path = "/graphql"
+    return await async_request.post(base_url, headers, root+path, name, payload)
\ No newline at end of file
@@ -5,4 +5,7 @@ class PTWrapperLibraryJSONResponse(Exception):
     pass
 
 class PTWrapperLibraryFailed(Exception):
+    pass
+
+class PTWrapperLibraryCircuitOpen(PTWrapperLibraryException):
     pass
\ No newline at end of file
@@ -1,17 +1,32 @@
 import yaml
-from copy import deepcopy
 import json
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from queue import Queue, Full
+import threading
+from typing import Iterator
 
 import settings
 import utils.log_handler as logger
 log = logger.log
 from utils.auth_handler import Auth
 import utils.input_utils as input
+import utils.general_utils as general_utils
+import utils.graphql_utils as graphql_utils
 from utils.log_handler import IterationMetrics
+from utils.journal_handler import DuplicationJournal
+from utils.procedure_index import ProcedureIndex
+from utils.technique_index import TechniqueRemap
+from utils.sync_state import SyncState
+import utils.snapshot_handler as snapshot_handler
+import utils.query_registry as query_registry
+import queries
 import api
 
 
-def load_repos_from_instance() -> list:
+def load_repos_from_instance(auth, include_empty=False) -> list:
     log.info(f'Loading Runbook Repositories from instance')
     # EXAMPLE schema of returned repositories
     # {
@@ -50,11 +65,11 @@ def load_repos_from_instance() -> list:
                 }
             }
         }
-        payload = {"operationName":"RunbookRepositoryListV2","variables":payload_vars,"query":"query RunbookRepositoryListV2($args: ListArgs!) {\n   runbookRepositoryListV2(args: $args) {\n     data {\n       ...RunbookRepositoryListDataV2\n       __typename\n     }\n     meta {\n       ...ListMetaData\n       __typename\n     }\n     __typename\n   }\n }\n \n fragment RunbookRepositoryListDataV2 on RunbookRepositoryV2 {\n   id\n   name\n   shortName\n   description\n   type\n   procedures {\n     id\n     __typename\n   }\n   isEditable\n   updatedAt\n   userCount\n   __typename\n }\n \n fragment ListMetaData on ListMeta {\n   pagination {\n     limit\n     offset\n     total\n     __typename\n   }\n   sort {\n     by\n     order\n     __typename\n   }\n   filters {\n     by\n     value\n     __typename\n   }\n   __typename\n }"}
-        response = api._runbooks._runbooks_v2._runbooksdb.repositories.runbookrepositorylistv2(auth.base_url, auth.get_auth_headers(), payload)
+        response = query_registry.send(api._runbooks._runbooks_v2._runbooksdb.repositories.runbookrepositorylistv2, auth, "RunbookRepositoryListV2", queries.REPOSITORY_LIST, payload_vars)
         if response.has_json_response:
             repos = response.json.get("data", {}).get("runbookRepositoryListV2", {}).get("data", [])
-            repos = list(filter(lambda x:len(x["procedures"])>0, repos))
+            if not include_empty:
+                repos = list(filter(lambda x:len(x["procedures"])>0, repos))
             log.success(f'Loaded {len(repos)} repository(s) from instance')
     except Exception as e:
         log.exception(e)
@@ -82,15 +97,35 @@ def get_repo_choice(repos) -> int:
     return input.user_list("Select a repository", "Invalid choice", len(repos)) - 1
 
 
-def create_new_repo():
-    # create new repo
-    repo_name = input.prompt_user(f'Enter a \'Repository Name\' for a new repository to duplicate procedures to')
-    repo_code = input.prompt_user(f'Enter a UNIQUE \'Repository ID Prefix\' for the new repository')
-    repo_description = input.prompt_user(f'Enter a \'Description\' for the new repository')
+def get_target_repo_choice(repos) -> int:
+    """
+    Prompts the user to select an existing runbook repository to duplicate procedures to.
+
+    :param repos: List of editable repostories returned from the POST RunbookRepositoryListV2 endpoint
+    :type repos: list[repository objects]
+    :return: 0-based index of selected repo from the list provided
+    :rtype: int
+    """
+    log.info(f'List of editable Runbook Repositories:')
+    index = 1
+    for repo in repos:
+        log.info(f'{index} | Name: {repo["name"]}  |  Repo ID Prefix: {repo["shortName"]}  |  Type: {repo["type"]}  |  Num Procedures: {len(repo["procedures"])}')
+        index += 1
+    return input.user_list("Select a repository to duplicate procedures to", "Invalid choice", len(repos)) - 1
+
+
+def create_new_repo(auth, repo_name=None, repo_code=None, repo_description=None):
+    # create new repo, values that are not passed in are prompted for
+    if repo_name == None:
+        repo_name = input.prompt_user(f'Enter a \'Repository Name\' for a new repository to duplicate procedures to')
+    if repo_code == None:
+        repo_code = input.prompt_user(f'Enter a UNIQUE \'Repository ID Prefix\' for the new repository')
+    if repo_description == None:
+        repo_description = input.prompt_user(f'Enter a \'Description\' for the new repository')
     repo_id = None
     try:
-        payload = {"operationName":"RunbookRepositoryCreateV2","variables":{"data":{"name":repo_name,"shortName":repo_code,"description":repo_description,"type":"open"}},"query":"mutation RunbookRepositoryCreateV2($data: RunbookRepositoryInputV2!) {\n  runbookRepositoryCreateV2(input: $data) {\n    id\n    name\n    shortName\n    description\n    type\n    isEditable\n    __typename\n  }\n}\n"}
-        response = api._runbooks._runbooks_v2._runbooksdb.repositories.runbookrepositorycreatev2(auth.base_url, auth.get_auth_headers(), payload)
+        payload_vars = {"data":{"name":repo_name,"shortName":repo_code,"description":repo_description,"type":"open"}}
+        response = query_registry.send(api._runbooks._runbooks_v2._runbooksdb.repositories.runbookrepositorycreatev2, auth, "RunbookRepositoryCreateV2", queries.REPOSITORY_CREATE, payload_vars)
         if response.has_json_response:
             if response.json.get("errors") != None:
                 log.critical(f'Could not create repo: {response.json.get("errors")[0].get("message", "No error message provided")}')
@@ -99,38 +134,34 @@ def create_new_repo():
         if repo_id == None:
             log.critical(f'Could not get id of new repository, exiting...')
             exit()
-        log.success(f'Created new repository')
+        log.success(f'Created new repository \'{repo_name}\'')
     except Exception as e:
         log.exception(e)
         exit() # must exit or check that repo_id gets set
     return repo_id
 
 
-def delete_repo(repo_id):
+def delete_repo(auth, repo_id):
     # since the script can run into issues with loading data from the instance, this function is used to help clean up
     # and not leave artifacts of a failed execution
     log.info(f'Cleaning up unfinished duplication')
     try:
-        payload = {"operationName":"RunbookRepositoryDeleteV2","variables":f"{'{'}\n    \"id\": \"{repo_id}\"\n{'}'}","query":"mutation RunbookRepositoryDeleteV2($id: ID!) {\n   runbookRepositoryDeleteV2(id: $id) {\n     id\n     deletedAt\n     __typename\n   }\n }"}
-        response = api._runbooks._runbooks_v2._runbooksdb.repositories.runbookrepositorydeletev2(auth.base_url, auth.get_auth_headers(), payload)
+        response = query_registry.send(api._runbooks._runbooks_v2._runbooksdb.repositories.runbookrepositorydeletev2, auth, "RunbookRepositoryDeleteV2", queries.REPOSITORY_DELETE, {"id": repo_id})
         if not response.has_json_response or not response.json.get('data', {}).get('runbookRepositoryDeleteV2', {}).get('deletedAt') != None:
             log.exception(f'Could not delete repository')
     except Exception as e:
         log.exception(e)
 
 
-def get_page_of_runbook_procedures(page: int = 0, procedures: list = [], total_procedures: int = -1) -> None:
+def iter_runbook_procedures(auth) -> Iterator[dict]:
     """
-    Handles traversing pagination results to create a list of all items.
+    Lazily yields every procedure in the RunbooksDB, page by page. The first page is loaded to get the total number
+    of procedures, then the following pages are loaded ahead concurrently.
 
-    :param page: page to start on, for all results use 0, defaults to 0
-    :type page: int, optional
-    :param clients: the list passed in will be added to, acts as return, defaults to [], not specifing this parameter will yield no results
-    :type clients: list, optional
-    :param total_clients: used for recursion to know when all pages have been gathered, defaults to -1
-    :type total_clients: int, optional
+    :yield: procedure items returned from the POST RunbookProcedureListV2 endpoint
+    :rtype: Iterator[dict]
     """
-    # client data from response is shaped like
+    # procedure data from response is shaped like
     # {
     #     "id": "clacwm7pe04hn29mqbu96b4n7",
     #     "name": "Plist Modification",
@@ -163,137 +194,224 @@ def get_page_of_runbook_procedures(page: int = 0, procedures: list = [], total_p
     #     ],
     #     "__typename": "RunbookProcedureV2"
     # }
-    payload = {"operationName":"RunbookProcedureListV2","variables":{"args":{"pagination":{"limit":100,"offset":page*100},"sort":[{"by":"shortName","order":"DESC"},{"by":"name","order":"DESC"}],"filters":[{"by":"tacticIds","value":[]},{"by":"methodologyIds","value":[]},{"by":"searchTerm","value":""}]}},"query":"query RunbookProcedureListV2($args: ListArgs!) {\n  runbookProcedureListV2(args: $args) {\n    data {\n      ...RunbookProcedureDataGridV2\n      __typename\n    }\n    meta {\n      ...ListMetaData\n      __typename\n    }\n    __typename\n  }\n}\n\nfragment RunbookProcedureDataGridV2 on RunbookProcedureV2 {\n  id\n  name\n  shortName\n  description\n  isEditable\n  updatedAt\n  deletedAt\n  repository {\n    id\n    name\n    shortName\n    type\n    __typename\n  }\n  techniques {\n    id\n    name\n    shortName\n    methodologies {\n      name\n      shortName\n      __typename\n    }\n    __typename\n  }\n  __typename\n}\n\nfragment ListMetaData on ListMeta {\n  pagination {\n    limit\n    offset\n    total\n    __typename\n  }\n  sort {\n    by\n    order\n    __typename\n  }\n  filters {\n    by\n    value\n    __typename\n  }\n  __typename\n}\n"}
-    response = api._runbooks._runbooks_v2._runbooksdb.procedures.runbookprocedurelistv2(auth.base_url, auth.get_auth_headers(), payload)
-    if response.json.get("data", {}).get("runbookProcedureListV2") == None:
+    args = {"sort":[{"by":"shortName","order":"DESC"},{"by":"name","order":"DESC"}],"filters":[{"by":"tacticIds","value":[]},{"by":"methodologyIds","value":[]},{"by":"searchTerm","value":""}]}
+    try:
+        yield from graphql_utils.iter_pages_v2(api._runbooks._runbooks_v2._runbooksdb.procedures.runbookprocedurelistv2, auth, "RunbookProcedureListV2", queries.PROCEDURE_LIST, args, settings.list_page_size, settings.list_page_workers)
+    except Exception as e:
+        log.exception(e)
         log.critical(f'Could not retrieve runbook procedures from instance. Exiting...')
         exit()
-    data_in_scope = response.json.get("data", {}).get("runbookProcedureListV2", {})
-    if len(data_in_scope.get("data", [])) > 0:
-        procedures += deepcopy(data_in_scope['data'])
-        total_procedures = data_in_scope['meta']['pagination']['total']
 
-    if len(procedures) != total_procedures:
-        return get_page_of_runbook_procedures(page+1, procedures, total_procedures)
 
-    return None
+def format_procedure_detail(data) -> dict:
+    """
+    Formats the data of a procedure returned from the POST RunbookProcedureDetailV2 endpoint into the input required to create a procedure.
 
+    :param data: `runbookProcedureV2` object returned from the POST RunbookProcedureDetailV2 endpoint
+    :type data: dict
+    :return: variables for the POST RunbookProcedureCreateV2 endpoint, without a `repositoryId`, and the `sourceId` of the
+    procedure the data was loaded from
+    :rtype: dict
+    """
+    #  shape of required input when creating procedures
+    # {
+    #     "data": {
+    #         "name": "Test Procedure",
+    #         "shortName": "pid",
+    #         "repositoryId": "clc0rr6v500540zo31c5i4cz2",
+    #         "description": "<p>desc</p>"
+    #     },
+    #     "executionSteps": [
+    #         {
+    #             "description": "<p>step 1</p>",
+    #             "successCriteria": "<p>did the thing</p>"
+    #         }
+    #     ],
+    #     "techniqueIds": [
+    #         "clacwm5ot02mv29mqevmb44lh"
+    #     ],
+    #     "tags": [
+    #         "test_tag"
+    #     ]
+    # }
+    data_formated = {}
+    data_formated['data'] = {}
+    data_formated['data']['name'] = data['name']
+    data_formated['data']['shortName'] = data['shortName']
+    data_formated['data']['description'] = data['description']
+    data_formated['executionSteps'] = [{"description":x['description'], "successCriteria":x['successCriteria']} for x in data['executionSteps']]
+    data_formated['techniqueIds'] = [x['id'] for x in data['techniques']]
+    data_formated['tags'] = data['tags']
+    data_formated['tags'] = [x['tag'] for x in data['tags']]
+    # not sent when creating the procedure, used to record which source procedure the created procedure is a copy of
+    data_formated['sourceId'] = data['id']
+    return data_formated
 
-def load_procedures_from_instance(repo) -> list:
-     # load procedures from repo in param
-    log.info(f'Loading procedures from Plextrac instance, this may take awhile...')
-    list_procedures = []
-    get_page_of_runbook_procedures(procedures=list_procedures)
-    log.debug(f'total: {len(list_procedures)}')
-    list_procedures = list(filter(lambda x: x['repository']['id']==repo['id'], list_procedures))
-    log.debug(f'filtered: {len(list_procedures)}')
-    log.success(f'Found {len(list_procedures)} procedures from \'{repo["name"]}\' repository, loading...')
 
-    procedures = []
-    metrics = IterationMetrics(len(list_procedures))
-    for procedure in list_procedures:
-        log.info(f'Loading procedure \'{procedure["name"]}\'')
-        # shape of expected response of procedure
-            # {
-                # "data": {
-                    # "runbookProcedureV2": {
-                        # "id": "clacwm7pe04hn29mqbu96b4n7",
-                        # "name": "Plist Modification",
-                        # "description": "Modify MacOS plist file in one of two directories\n\n\n**Supported Platforms:** macos\n\n",
-                        # "shortName": "T1647",
-                        # "isEditable": false,
-                        # "repository": {
-                            # "id": "clacwm17b000029mqcwg1etc9",
-                            # "name": "PlexTrac Curated",
-                            # "shortName": "PlexTrac",
-                            # "__typename": "RunbookRepositoryV2"
-                        # },
-                        # tags': [
-                        #     {
-                        #         'id': 'clkk8keob01b50zm21v6k6qgb',
-                        #         'tag': 'hotdog',
-                        #         '__typename': 'RunbookTag'
-                        #     }
-                        # ]
-                        # "executionSteps": [
-                            # {
-                                # "id": "clacwm7pe04ho29mqds8u98xg",
-                                # "description": "1. Modify a .plist in\n\n    /Library/Preferences\n\n    OR\n\n    ~/Library/Preferences\n\n2. Subsequently, follow the steps for adding and running via [Launch Agent](Persistence/Launch_Agent.md)\n",
-                                # "successCriteria": null,
-                                # "__typename": "RunbookProcedureStep"
-                            # }
-                        # ],
-                        # "techniques": [
-                            # {
-                                # "id": "clacwm6bg03ag29mq06ho26ob",
-                                # "name": "Plist File Modification",
-                                # "shortName": "T1647",
-                                # "tactics": [
-                                    # {
-                                        # "id": "clacwm5oh02mf29mqf5andaw8",
-                                        # "name": "Defense Evasion",
-                                        # "methodologies": [
-                                            # {
-                                                # "id": "clacwm5nx02m229mqci14ckrd",
-                                                # "name": "Mitre ATT&CK 11.3",
-                                                # "__typename": "RunbookMethodologyV2"
-                                            # }
-                                        # ],
-                                        # "__typename": "RunbookTacticV2"
-                                    # }
-                                # ],
-                                # "__typename": "RunbookTechniqueV2"
-                            # }
-                        # ],
-                        # "__typename": "RunbookProcedureV2"
-                    # }
+def load_procedure_detail(auth, procedure) -> dict:
+    """
+    Loads the details of a single procedure and formats them into the input required to create a procedure.
+    Errors are logged and the procedure is skipped by returning None.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param procedure: procedure item from `list_procedures_in_repo`, only the `id` is required
+    :type procedure: procedure object
+    :return: variables for the POST RunbookProcedureCreateV2 endpoint, or None if the procedure could not be loaded
+    :rtype: dict
+    """
+    log.info(f'Loading procedure \'{procedure.get("name", procedure["id"])}\'')
+    # shape of expected response of procedure, only the fields needed to create a copy are selected
+        # {
+            # "data": {
+                # "runbookProcedureV2": {
+                    # "id": "clacwm7pe04hn29mqbu96b4n7",
+                    # "name": "Plist Modification",
+                    # "shortName": "T1647",
+                    # "description": "Modify MacOS plist file in one of two directories\n\n\n**Supported Platforms:** macos\n\n",
+                    # "executionSteps": [
+                        # {
+                            # "description": "1. Modify a .plist in\n\n    /Library/Preferences\n\n    OR\n\n    ~/Library/Preferences\n\n2. Subsequently, follow the steps for adding and running via [Launch Agent](Persistence/Launch_Agent.md)\n",
+                            # "successCriteria": null
+                        # }
+                    # ],
+                    # "techniques": [
+                        # {
+                            # "id": "clacwm6bg03ag29mq06ho26ob"
+                        # }
+                    # ],
+                    # "tags": [
+                        # {
+                            # "tag": "hotdog"
+                        # }
+                    # ]
                 # }
             # }
+        # }
+    try:
+        response = query_registry.send(api._runbooks._runbooks_v2._runbooksdb.procedures.runbookproceduredetailv2, auth, "RunbookProcedureDetailV2", queries.PROCEDURE_DETAIL, {"id": procedure["id"]})
+        if response.has_json_response:
+            log.debug(f'JSON received from get runbookproceduredetailv2: {response.json}')
+            data = response.json.get("data", {}).get("runbookProcedureV2", {})
+            data_formated = format_procedure_detail(data)
+            log.debug(f'Formatted data to be used to create new procedure: {data_formated}')
+            return data_formated
+    except Exception as e:
+        log.exception(e)
+        log.exception(f'Could not load procedure \'{procedure.get("name", procedure["id"])}\', skipping...')
+    return None
+
+
+def load_procedure_details_batch(auth, procedures) -> list:
+    """
+    Loads the details of several procedures with a single request and formats them into the input required to create a procedure.
+
+    Each procedure is selected under its own alias in one query document. Procedures that return an error or no data are
+    retried individually with `load_procedure_detail`. If the whole request fails, every procedure is retried individually.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param procedures: procedure items from `list_procedures_in_repo`, only the `id` is required
+    :type procedures: list[procedure object]
+    :return: result of `load_procedure_detail` for each procedure, in the same order as `procedures`
+    :rtype: list[dict]
+    """
+    if len(procedures) == 1:
+        return [load_procedure_detail(auth, procedures[0])]
+
+    log.info(f'Loading {len(procedures)} procedures \'{procedures[0].get("name", procedures[0]["id"])}\' to \'{procedures[-1].get("name", procedures[-1]["id"])}\'')
+    aliases = [f'procedure{i}' for i in range(len(procedures))]
+    query = queries.get_procedure_detail_batch(len(procedures))
+    variables = {f'id{i}': procedure['id'] for i, procedure in enumerate(procedures)}
+    try:
+        response = query_registry.send(api._runbooks._runbooks_v2._runbooksdb.procedures.runbookproceduredetailv2, auth, "RunbookProcedureDetailV2Batch", query, variables)
+        if not response.has_json_response:
+            raise Exception(f'No JSON data returned when loading a batch of {len(procedures)} procedures')
+    except Exception as e:
+        log.exception(e)
+        log.exception(f'Could not load batch of {len(procedures)} procedures, loading each procedure individually...')
+        return [load_procedure_detail(auth, procedure) for procedure in procedures]
+
+    response_data = response.json.get("data") or {}
+    errored_aliases = [error.get("path", [None])[0] for error in response.json.get("errors", [])]
+    data_formated_list = []
+    for alias, procedure in zip(aliases, procedures):
+        data = response_data.get(alias)
+        if data == None or alias in errored_aliases:
+            log.warning(f'Could not load procedure \'{procedure.get("name", procedure["id"])}\' in batch, loading individually...')
+            data_formated_list.append(load_procedure_detail(auth, procedure))
+            continue
         try:
-            payload = {"operationName":"RunbookProcedureDetailV2","variables": f"{'{'}\n    \"id\": \"{procedure['id']}\"\n{'}'}","query": "query RunbookProcedureDetailV2($id: ID!) {\n  runbookProcedureV2(id: $id) {\n    id\n    name\n    description\n    shortName\n    isEditable\n    repository {\n      id\n      name\n      shortName\n      __typename\n    }\n    tags {\n      id\n      tag\n      __typename\n    }\n    executionSteps {\n      id\n      description\n      successCriteria\n      __typename\n    }\n    techniques {\n      ...RunbookProcedureDetailTechniqueV2\n      __typename\n    }\n    __typename\n  }\n}\n\nfragment RunbookProcedureDetailTechniqueV2 on RunbookTechniqueV2 {\n  id\n  name\n  shortName\n  tactics {\n    id\n    name\n    methodologies {\n      id\n      name\n      __typename\n    }\n    __typename\n  }\n  __typename\n}"}
-            response = api._runbooks._runbooks_v2._runbooksdb.procedures.runbookproceduredetailv2(auth.base_url, auth.get_auth_headers(), payload)
-            if response.has_json_response:
-                log.debug(f'JSON received from get runbookproceduredetailv2: {response.json}')
-                data = response.json.get("data", {}).get("runbookProcedureV2", {})
-                #  shape of required input when creating procedures
-                # {
-                #     "data": {
-                #         "name": "Test Procedure",
-                #         "shortName": "pid",
-                #         "repositoryId": "clc0rr6v500540zo31c5i4cz2",
-                #         "description": "<p>desc</p>"
-                #     },
-                #     "executionSteps": [
-                #         {
-                #             "description": "<p>step 1</p>",
-                #             "successCriteria": "<p>did the thing</p>"
-                #         }
-                #     ],
-                #     "techniqueIds": [
-                #         "clacwm5ot02mv29mqevmb44lh"
-                #     ],
-                #     "tags": [
-                #         "test_tag"
-                #     ]
-                # }
-                data_formated = {}
-                data_formated['data'] = {}
-                data_formated['data']['name'] = data['name']
-                data_formated['data']['shortName'] = data['shortName']
-                data_formated['data']['description'] = data['description']
-                data_formated['executionSteps'] = [{"description":x['description'], "successCriteria":x['successCriteria']} for x in data['executionSteps']]
-                data_formated['techniqueIds'] = [x['id'] for x in data['techniques']]
-                data_formated['tags'] = data['tags']
-                data_formated['tags'] = [x['tag'] for x in data['tags']]
-                log.debug(f'Formatted data to be used to create new procedure: {data_formated}')
-                procedures.append(data_formated)
+            data_formated = format_procedure_detail(data)
+            log.debug(f'Formatted data to be used to create new procedure: {data_formated}')
+            data_formated_list.append(data_formated)
         except Exception as e:
             log.exception(e)
-            log.exception(f'Could not load procedure \'{procedure["name"]}\', skipping...')
-            log.info(metrics.print_iter_metrics())
-            continue
+            log.exception(f'Could not load procedure \'{procedure.get("name", procedure["id"])}\', skipping...')
+            data_formated_list.append(None)
+    return data_formated_list
 
-        log.info(metrics.print_iter_metrics())
+
+def load_procedure_details(auth, procedures) -> list:
+    """
+    Gets the details of several procedures. Details recorded in the journal by a previous run are reused, the rest
+    are loaded with `load_procedure_details_batch` and recorded in the journal.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param procedures: procedure items from `list_procedures_in_repo`, only the `id` is required
+    :type procedures: list[procedure object]
+    :return: result of `load_procedure_detail` for each procedure, in the same order as `procedures`
+    :rtype: list[dict]
+    """
+    if journal == None:
+        return load_procedure_details_batch(auth, procedures)
+
+    procedures_to_load = [x for x in procedures if journal.get_detail(x['id']) == None]
+    if len(procedures_to_load) < len(procedures):
+        log.debug(f'Using {len(procedures) - len(procedures_to_load)} procedure details from journal')
+    loaded = iter(load_procedure_details_batch(auth, procedures_to_load) if len(procedures_to_load) > 0 else [])
+    data_formated_list = []
+    for procedure in procedures:
+        data_formated = journal.get_detail(procedure['id'])
+        if data_formated == None:
+            data_formated = next(loaded)
+            if data_formated != None:
+                journal.record_detail(procedure['id'], data_formated)
+        data_formated_list.append(data_formated)
+    return data_formated_list
+
+
+def list_procedures_in_repo(auth, repo) -> list:
+    # list procedures from repo in param, does not include procedure details
+    # the POST RunbookRepositoryListV2 endpoint already returns the id of each procedure in the repo, use those instead
+    # of listing every procedure in the tenant. items only contain an `id`
+    if repo.get('procedures') != None:
+        log.debug(f'Using {len(repo["procedures"])} procedure ids listed with repository \'{repo["name"]}\'')
+        return [{"id": x['id']} for x in repo['procedures']]
+
+    log.info(f'Loading procedures from Plextrac instance, this may take awhile...')
+    # only procedures in the repo are kept as the pages stream in
+    list_procedures = [x for x in iter_runbook_procedures(auth) if x['repository']['id']==repo['id']]
+    log.debug(f'filtered: {len(list_procedures)}')
+    return list_procedures
+
+
+def load_procedures_from_instance(auth, repo) -> list:
+     # load procedures from repo in param
+    list_procedures = list_procedures_in_repo(auth, repo)
+    log.success(f'Found {len(list_procedures)} procedures from \'{repo["name"]}\' repository, loading...')
+
+    # batches of details are fetched by a pool of workers, `executor.map` returns results in the same order as `list_procedures`
+    procedures = []
+    batches = general_utils.chunk_list(list_procedures, settings.procedure_detail_batch_size)
+    metrics = IterationMetrics(len(batches))
+    with ThreadPoolExecutor(max_workers=settings.procedure_load_workers) as executor:
+        for batch in executor.map(load_procedure_details, [auth] * len(batches), batches):
+            for data_formated in batch:
+                if data_formated != None:
+                    procedures.append(data_formated)
+            log.info(metrics.print_iter_metrics())
     log.success(f'Loaded {len(procedures)} procedures from \'{repo["name"]}\' repository')
 
     # make sure all procedures were loaded
@@ -304,63 +422,1027 @@ def load_procedures_from_instance(repo) -> list:
     return procedures
 
 
-def add_procedures_to_repo(repo_id, procedures):
-    # create procedures in new repo
+def load_techniques(auth) -> list:
+    """
+    Loads every technique on an instance, page by page.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :return: technique objects returned from the POST RunbookTechniqueListV2 endpoint, with only the fields used to match techniques between instances
+    :rtype: list
+    """
+    log.info(f'Loading techniques from {auth.base_url}')
+    try:
+        techniques = graphql_utils.get_all_pages_v2(api._runbooks._runbooks_v2._runbooksdb.techniques.runbooktechniquelistv2, auth, "RunbookTechniqueListV2", queries.TECHNIQUE_LIST, {}, settings.list_page_size, settings.list_page_workers)
+    except Exception as e:
+        log.exception(e)
+        log.critical(f'Could not load techniques from {auth.base_url}. Exiting...')
+        exit()
+    log.success(f'Loaded {len(techniques)} techniques from {auth.base_url}')
+    return techniques
+
+
+def load_technique_remap(target_auth, source_auth=None, source_techniques=None) -> TechniqueRemap:
+    """
+    Builds the map of source technique ids to target technique ids, used when procedures are duplicated to a different
+    instance. The technique lists of both instances are loaded at the same time.
+
+    :param target_auth: authentication context of the instance to create procedures in
+    :type target_auth: Auth
+    :param source_auth: authentication context of the instance to load procedures from, defaults to None
+    :type source_auth: Auth, optional
+    :param source_techniques: techniques of the source instance, such as from a snapshot, instead of loading them
+    with `source_auth`, defaults to None
+    :type source_techniques: list, optional
+    :return: map of technique ids
+    :rtype: TechniqueRemap
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        target_future = executor.submit(load_techniques, target_auth)
+        if source_techniques == None:
+            source_techniques = load_techniques(source_auth)
+        target_techniques = target_future.result()
+    technique_remap = TechniqueRemap(source_techniques, target_techniques)
+    log.success(f'Matched {len(technique_remap.mapping)}/{technique_remap.source_count} source techniques to techniques on the target instance')
+    return technique_remap
+
+
+def remap_techniques(procedure) -> dict:
+    """
+    Replaces the source technique ids of a procedure with the ids of the same techniques on the target instance, when
+    duplicating to a different instance.
+
+    :param procedure: variables for the POST RunbookProcedureCreateV2 endpoint returned from `load_procedure_detail`
+    :type procedure: dict
+    :return: copy of the procedure with remapped technique ids, or the same procedure if technique ids are not remapped
+    :rtype: dict
+    """
+    if technique_remap == None:
+        return procedure
+    return dict(procedure, techniqueIds=technique_remap.remap(procedure['techniqueIds']))
+
+
+def load_existing_procedures(auth, repo) -> ProcedureIndex:
+    """
+    Loads the procedures already in the repository procedures are duplicated to and indexes them by content, so
+    procedures that already have a copy in the repository are not created again.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param repo: repository object procedures are duplicated to
+    :type repo: repository object
+    :return: index of the existing procedures, or None if the user chose not to continue
+    :rtype: ProcedureIndex
+    """
+    list_procedures = list_procedures_in_repo(auth, repo)
+    log.info(f'Loading {len(list_procedures)} existing procedures from \'{repo["name"]}\' repository to check for copies...')
+    # existing procedures are loaded directly instead of with `load_procedure_details`, they are not source procedures and are not journaled
+    index = ProcedureIndex()
+    batches = general_utils.chunk_list(list_procedures, settings.procedure_detail_batch_size)
+    with ThreadPoolExecutor(max_workers=settings.procedure_load_workers) as executor:
+        for batch in executor.map(load_procedure_details_batch, [auth] * len(batches), batches):
+            for data_formated in batch:
+                if data_formated != None:
+                    index.add(data_formated)
+    log.success(f'Loaded {index.size} existing procedures from \'{repo["name"]}\' repository')
+
+    if len(list_procedures) != index.size:
+        if not input.continue_anyways(f'Found {len(list_procedures)} existing procedures, but only loaded {index.size}. Procedures that could not be loaded may be duplicated'):
+            return None
+    return index
+
+
+def skip_existing_procedure(procedure) -> bool:
+    """
+    Checks if a copy of a procedure is already in the repository procedures are duplicated to. Copies that are found
+    are recorded in the journal as created.
+
+    :param procedure: variables for the POST RunbookProcedureCreateV2 endpoint returned from `load_procedure_detail`
+    :type procedure: dict
+    :return: whether the procedure already has a copy and should not be created
+    :rtype: bool
+    """
+    if existing_procedures == None:
+        return False
+    existing_id = existing_procedures.claim(procedure)
+    if existing_id == None:
+        return False
+    record_created(procedure, existing_id)
+    log.debug(f'Skipping procedure \'{procedure["data"]["name"]}\', already in repository')
+    return True
+
+
+def record_created(procedure, target_id) -> None:
+    """
+    Records a created procedure in the journal, so it is not created again if the run is resumed, or in the sync
+    state when using --sync
+
+    :param procedure: variables for the POST RunbookProcedureCreateV2 endpoint returned from `load_procedure_detail`
+    :type procedure: dict
+    :param target_id: id of the created procedure
+    :type target_id: str
+    """
+    if procedure.get('sourceId') == None:
+        return
+    if journal != None:
+        journal.record_created(procedure['sourceId'], target_id)
+    if sync_state != None:
+        sync_state.record_synced(procedure['sourceId'], target_id)
+
+
+def create_procedure(auth, repo_id, procedure) -> bool:
+    """
+    Creates a single procedure in a repository. Errors are logged and the procedure is skipped.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param repo_id: id of the repository to create the procedure in
+    :type repo_id: str
+    :param procedure: variables for the POST RunbookProcedureCreateV2 endpoint returned from `load_procedure_detail`
+    :type procedure: dict
+    :return: whether the procedure was created
+    :rtype: bool
+    """
+    log.info(f'Creating procedure \'{procedure["data"]["name"]}\'...')
+    try:
+        # copy instead of setting the repositoryId on the loaded procedure, which is shared between threads
+        variables = dict(procedure)
+        variables['data'] = dict(procedure['data'], repositoryId=repo_id)
+        variables.pop('sourceId', None)
+        response = query_registry.send(api._runbooks._runbooks_v2._runbooksdb.procedures.runbookprocedurecreatev2, auth, "RunbookProcedureCreateV2", queries.PROCEDURE_CREATE, variables)
+        log.debug(f'JSON response from create procedure request: {response.json}')
+        if response.json.get("errors") != None:
+            log.error(f'Could not create procedure \'{procedure["data"]["name"]}\': {response.json.get("errors")[0].get("message", "No error message provided")}')
+            return False
+        record_created(procedure, response.json.get("data", {}).get("runbookProcedureCreateV2", {}).get("id"))
+        log.success(f'Created procedure \'{procedure["data"]["name"]}\'')
+        return True
+    except Exception as e:
+        log.exception(e)
+        log.exception(f'Could not create procedure, skipping...')
+        return False
+
+
+def create_procedures_batch(auth, repo_id, procedures) -> int:
+    """
+    Creates several procedures with a single request, in the order they are listed.
+
+    Each procedure is created under its own alias in one mutation document. The top level fields of a mutation are
+    executed one after another, so the procedures are created in order. Procedures whose alias returns an error are
+    retried individually with `create_procedure`. If the mutation is rejected before any procedure is created, every
+    procedure is retried individually. If the mutation returns no data after it started creating procedures, the batch
+    is not retried, since some procedures may already have been created.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param repo_id: id of the repository to create the procedures in
+    :type repo_id: str
+    :param procedures: list of variables for the POST RunbookProcedureCreateV2 endpoint
+    :type procedures: list[dict]
+    :return: number of procedures that were created
+    :rtype: int
+    """
+    if len(procedures) == 1:
+        return 1 if create_procedure(auth, repo_id, procedures[0]) else 0
+
+    log.info(f'Creating {len(procedures)} procedures \'{procedures[0]["data"]["name"]}\' to \'{procedures[-1]["data"]["name"]}\'...')
+    aliases = [f'procedure{i}' for i in range(len(procedures))]
+    query = queries.get_procedure_create_batch(len(procedures))
+    variables = {}
+    for i, procedure in enumerate(procedures):
+        variables[f'data{i}'] = dict(procedure['data'], repositoryId=repo_id)
+        variables[f'executionSteps{i}'] = procedure['executionSteps']
+        variables[f'techniqueIds{i}'] = procedure['techniqueIds']
+        variables[f'tags{i}'] = procedure['tags']
+    try:
+        response = query_registry.send(api._runbooks._runbooks_v2._runbooksdb.procedures.runbookprocedurecreatev2, auth, "RunbookProcedureCreateV2Batch", query, variables)
+        log.debug(f'JSON response from create procedure batch request: {response.json}')
+    except Exception as e:
+        # the request may have reached the instance, retrying could create duplicate procedures
+        log.exception(e)
+        log.exception(f'Could not create batch of {len(procedures)} procedures, skipping...')
+        return 0
+
+    response_data = response.json.get("data")
+    if response_data == None:
+        errors = response.json.get("errors") or []
+        # errors without a `path` are validation errors, the mutation was rejected before any procedure was created.
+        # an error on a field returns no data after the aliases before it already ran, retrying could create duplicate procedures
+        if all([error.get("path") == None for error in errors]):
+            log.warning(f'Batch of {len(procedures)} procedures was rejected, creating each procedure individually...')
+            return sum([1 if create_procedure(auth, repo_id, procedure) else 0 for procedure in procedures])
+        message = errors[0].get("message", "No error message provided")
+        log.error(f'Could not create batch of {len(procedures)} procedures \'{procedures[0]["data"]["name"]}\' to \'{procedures[-1]["data"]["name"]}\': {message}. Some may have been created, skipping...')
+        return 0
+
+    alias_errors = {}
+    for error in response.json.get("errors", []):
+        alias_errors[error.get("path", [None])[0]] = error.get("message", "No error message provided")
+    success_count = 0
+    for alias, procedure in zip(aliases, procedures):
+        if response_data.get(alias) == None:
+            log.warning(f'Could not create procedure \'{procedure["data"]["name"]}\' in batch: {alias_errors.get(alias, "No error message provided")}. Retrying individually...')
+            if create_procedure(auth, repo_id, procedure):
+                success_count += 1
+            continue
+        success_count += 1
+        record_created(procedure, response_data[alias].get("id"))
+        log.success(f'Created procedure \'{procedure["data"]["name"]}\'')
+    return success_count
+
+
+def create_procedures_in_order(auth, repo_id, procedures) -> int:
+    """
+    Creates a list of procedures in batches, in the order they are listed.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param repo_id: id of the repository to create the procedures in
+    :type repo_id: str
+    :param procedures: list of variables for the POST RunbookProcedureCreateV2 endpoint
+    :type procedures: list[dict]
+    :return: number of procedures that were created
+    :rtype: int
+    """
+    success_count = 0
+    for batch in general_utils.chunk_list(procedures, settings.procedure_create_batch_size):
+        success_count += create_procedures_batch(auth, repo_id, batch)
+    return success_count
+
+
+def add_procedures_to_repo(auth, repo_id, procedures) -> int:
+    # create procedures in new repo, returns the number of procedures created
+    procedures = [remap_techniques(x) for x in procedures]
+    if existing_procedures != None:
+        procedures_to_create = [x for x in procedures if not skip_existing_procedure(x)]
+        log.success(f'Skipping {len(procedures) - len(procedures_to_create)} procedure(s) already in the repository')
+        procedures = procedures_to_create
     log.info(f'Creating procedures in new repository...')
+    units = get_procedure_create_units(procedures)
+
     success_count = 0
-    metrics = IterationMetrics(len(procedures))
-    for procedure in procedures:
-        log.info(f'Creating procedure \'{procedure["data"]["name"]}\'...')
-        try:
-            procedure['data']['repositoryId'] = repo_id
-            payload = {"operationName":"RunbookProcedureCreateV2","variables":procedure,"query":"mutation RunbookProcedureCreateV2($data: RunbookProcedureInputV2!, $executionSteps: [RunbookProcedureExecutionStepInput!]!, $techniqueIds: [ID!], $tags: [String!]) {\n  runbookProcedureCreateV2(\n    input: $data\n    executionSteps: $executionSteps\n    techniqueIds: $techniqueIds\n    tags: $tags\n  ) {\n    ...RunbookProcedureFormDataV2\n    __typename\n  }\n}\n\nfragment RunbookProcedureFormDataV2 on RunbookProcedureV2 {\n  id\n  name\n  shortName\n  description\n  isEditable\n  repositoryId\n  executionSteps {\n    id\n    description\n    successCriteria\n    sortOrder\n    __typename\n  }\n  techniques {\n    ...RunbookProcedureFormTechniqueDataV2\n    __typename\n  }\n  tags {\n    id\n    tag\n    __typename\n  }\n  __typename\n}\n\nfragment RunbookProcedureFormTechniqueDataV2 on RunbookTechniqueV2 {\n  id\n  name\n  shortName\n  description\n  tactics {\n    id\n    name\n    shortName\n    __typename\n  }\n  methodologies {\n    id\n    name\n    shortName\n    __typename\n  }\n  __typename\n}\n"}
-            response = api._runbooks._runbooks_v2._runbooksdb.procedures.runbookprocedurecreatev2(auth.base_url, auth.get_auth_headers(), payload)
-            log.debug(f'JSON response from create procedure request: {response.json}')
-            success_count += 1
-            log.success(f'Created procedure \'{procedure["data"]["name"]}\'')
-        except Exception as e:
-            log.exception(e)
-            log.exception(f'Could not create procedure, skipping...')
+    metrics = IterationMetrics(len(units))
+    with ThreadPoolExecutor(max_workers=settings.procedure_create_workers) as executor:
+        futures = [executor.submit(create_procedures_in_order, auth, repo_id, unit) for unit in units]
+        for future in as_completed(futures):
+            success_count += future.result()
             log.info(metrics.print_iter_metrics())
-            continue
-        log.info(metrics.print_iter_metrics())
 
     log.success(f'Added {success_count}/{len(procedures)} procedure(s) into the new repository')
+    return success_count
+
+
+def get_procedure_create_units(procedures) -> list:
+    """
+    Splits procedures into units of work. Each unit is created in order by a single worker with
+    `create_procedures_in_order`, while separate units are created concurrently.
+
+    :param procedures: list of variables for the POST RunbookProcedureCreateV2 endpoint
+    :type procedures: list[dict]
+    :return: units of procedures, in the same order as `procedures` within each unit
+    :rtype: list[list[dict]]
+    """
+    if settings.preserve_short_name_order:
+        # procedures sharing a `shortName` are listed in the order they were created, keep the source order within each group.
+        # whole groups are packed into units of at least a batch, the aliases of a batch are created one after another so
+        # groups smaller than a batch still share requests
+        groups = {}
+        for procedure in procedures:
+            groups.setdefault(procedure['data']['shortName'], []).append(procedure)
+        units = []
+        unit = []
+        for group in groups.values():
+            unit += group
+            if len(unit) >= settings.procedure_create_batch_size:
+                units.append(unit)
+                unit = []
+        if len(unit) > 0:
+            units.append(unit)
+    else:
+        units = general_utils.chunk_list(procedures, settings.procedure_create_batch_size)
+    return units
+
+
+def load_procedure_details_windowed(auth, list_procedures, executor: ThreadPoolExecutor, window: int) -> Iterator[dict]:
+    """
+    Loads procedure details in batches on the `executor` and yields them in the same order as `list_procedures`.
+    At most `window` batches are loading or waiting to be yielded at a time.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param list_procedures: procedure items from `list_procedures_in_repo`
+    :type list_procedures: list
+    :param executor: pool of workers to load details with
+    :type executor: ThreadPoolExecutor
+    :param window: max number of batches loading at a time
+    :type window: int
+    :yield: result of `load_procedure_detail` for each procedure
+    :rtype: Iterator[dict]
+    """
+    pending = deque()
+    for batch in general_utils.chunk_list(list_procedures, settings.procedure_detail_batch_size):
+        pending.append(executor.submit(load_procedure_details, auth, batch))
+        if len(pending) >= window:
+            yield from pending.popleft().result()
+    while len(pending) > 0:
+        yield from pending.popleft().result()
+
+
+def create_procedures_from_queue(auth, repo_id, procedure_queue: Queue, metrics: IterationMetrics, metrics_lock: threading.Lock) -> int:
+    """
+    Creates procedures taken from a queue, in the order they were added, until a None is taken from the queue.
+    Procedures already waiting in the queue are created together in batches of up to `procedure_create_batch_size`.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param repo_id: id of the repository to create the procedures in
+    :type repo_id: str
+    :param procedure_queue: queue of variables for the POST RunbookProcedureCreateV2 endpoint
+    :type procedure_queue: Queue
+    :param metrics: metrics shared by all threads duplicating procedures
+    :type metrics: IterationMetrics
+    :param metrics_lock: lock held while updating the shared `metrics`
+    :type metrics_lock: threading.Lock
+    :return: number of procedures that were created
+    :rtype: int
+    """
+    success_count = 0
+    done = False
+    while not done:
+        batch = []
+        procedure = procedure_queue.get()
+        while procedure != None:
+            batch.append(procedure)
+            if len(batch) >= settings.procedure_create_batch_size or procedure_queue.empty():
+                break
+            procedure = procedure_queue.get()
+        done = procedure == None
+        if len(batch) == 0:
+            continue
+        success_count += create_procedures_batch(auth, repo_id, batch)
+        with metrics_lock:
+            for procedure in batch:
+                log.info(metrics.print_iter_metrics())
+    return success_count
+
+
+def put_in_creator_queue(creator_queue: Queue, procedure, creators: list) -> bool:
+    """
+    Adds a procedure to the queue of a worker creating procedures, waiting while the queue is full. A worker that stopped
+    with an exception no longer takes procedures from its queue, so waiting stops if any of the `creators` stopped.
+
+    :param creator_queue: queue of the worker
+    :type creator_queue: Queue
+    :param procedure: variables for the POST RunbookProcedureCreateV2 endpoint, or None to stop the worker
+    :type procedure: dict
+    :param creators: futures of the workers taking procedures from `creator_queue`
+    :type creators: list[Future]
+    :return: whether the procedure was added to the queue
+    :rtype: bool
+    """
+    while True:
+        try:
+            creator_queue.put(procedure, timeout=1)
+            return True
+        except Full:
+            if any([creator.done() for creator in creators]):
+                return False
+
+
+def create_procedures_streamed(auth, repo_id, procedures: Iterator[dict], total: int) -> tuple:
+    """
+    Creates procedures in the new repo as they are taken from an iterator, such as procedures being loaded or read from
+    a snapshot file.
+
+    Procedures are handed to the workers creating procedures through bounded queues. At most `pipeline_queue_size`
+    procedures are waiting to be created at a time, or one per worker if it is set lower than `procedure_create_workers`.
+    Taking the next procedure from `procedures` waits while the creators are behind.
+
+    :param auth: authentication context of the instance to create procedures in
+    :type auth: Auth
+    :param repo_id: id of the repository to create the procedures in
+    :type repo_id: str
+    :param procedures: variables for the POST RunbookProcedureCreateV2 endpoint, or None for a procedure that could not be loaded
+    :type procedures: Iterator[dict]
+    :param total: number of procedures expected from `procedures`, used for metrics
+    :type total: int
+    :return: number of procedures taken from the iterator, skipped because they are already in the repository, and created
+    :rtype: tuple[int, int, int]
+    """
+    num_creators = settings.procedure_create_workers
+    if settings.preserve_short_name_order:
+        # procedures sharing a `shortName` always go to the same worker, which creates them in the order they were queued.
+        # the workers' queues share `pipeline_queue_size` between them
+        creator_queue_size = max(1, settings.pipeline_queue_size // num_creators)
+        creator_queues = [Queue(maxsize=creator_queue_size) for i in range(num_creators)]
+    else:
+        creator_queues = [Queue(maxsize=settings.pipeline_queue_size)] * num_creators
+
+    loaded_count = 0
+    skipped_count = 0
+    metrics = IterationMetrics(total)
+    metrics_lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=num_creators) as create_executor:
+        creators = [create_executor.submit(create_procedures_from_queue, auth, repo_id, creator_queue, metrics, metrics_lock) for creator_queue in creator_queues]
+
+        try:
+            # procedures are queued in source order, queueing waits while the creators are behind so loading never gets far ahead of creating
+            for data_formated in procedures:
+                if data_formated == None:
+                    with metrics_lock:
+                        log.info(metrics.print_iter_metrics())
+                    continue
+                loaded_count += 1
+                data_formated = remap_techniques(data_formated)
+                if skip_existing_procedure(data_formated):
+                    skipped_count += 1
+                    with metrics_lock:
+                        log.info(metrics.print_iter_metrics())
+                    continue
+                if not put_in_creator_queue(creator_queues[hash(data_formated['data']['shortName']) % num_creators], data_formated, creators):
+                    # raises the exception the worker stopped with, instead of waiting forever for its queue to empty
+                    next(creator for creator in creators if creator.done()).result()
+                    raise Exception(f'A worker creating procedures stopped before every procedure was created')
+        finally:
+            # the workers still running are stopped, also when the run is aborted, so the executor can shut down
+            for creator_queue, creator in zip(creator_queues, creators):
+                if not creator.done():
+                    put_in_creator_queue(creator_queue, None, [creator])
+        success_count = sum([creator.result() for creator in creators])
+    return loaded_count, skipped_count, success_count
+
+
+def duplicate_procedures_pipelined(source_auth, target_auth, repo, repo_id) -> bool:
+    """
+    Loads procedures from the selected repo and creates them in the new repo at the same time.
+
+    Procedure details are loaded by a pool of workers and passed to `create_procedures_streamed` as soon as they are
+    loaded. Creating procedures starts while the rest are still loading, and at most `pipeline_queue_size` loaded
+    procedures are waiting to be created at a time, regardless of the size of the repo.
+
+    :param source_auth: authentication context of the instance to load procedures from
+    :type source_auth: Auth
+    :param target_auth: authentication context of the instance to create procedures in
+    :type target_auth: Auth
+    :param repo: repository object selected for duplication
+    :type repo: repository object
+    :param repo_id: id of the repository to create the procedures in
+    :type repo_id: str
+    :return: False if the user chose not to continue, otherwise True
+    :rtype: bool
+    """
+    list_procedures = list_procedures_in_repo(source_auth, repo)
+    log.success(f'Found {len(list_procedures)} procedures from \'{repo["name"]}\' repository')
+    if not input.continue_anyways(f'Load {len(list_procedures)} procedures into new repository'):
+        return False
+    log.info(f'Loading and creating procedures in new repository...')
+
+    with ThreadPoolExecutor(max_workers=settings.procedure_load_workers) as load_executor:
+        window = max(1, settings.pipeline_queue_size // settings.procedure_detail_batch_size)
+        procedures = load_procedure_details_windowed(source_auth, list_procedures, load_executor, window)
+        loaded_count, skipped_count, success_count = create_procedures_streamed(target_auth, repo_id, procedures, len(list_procedures))
+
+    log.success(f'Loaded {loaded_count}/{len(list_procedures)} procedures from \'{repo["name"]}\' repository')
+    if existing_procedures != None:
+        log.success(f'Skipped {skipped_count} procedure(s) already in the repository')
+    log.success(f'Added {success_count}/{len(list_procedures) - skipped_count} procedure(s) into the new repository')
+    return True
+
+
+def duplicate_procedures(source_auth, target_auth, repo, repo_id) -> bool:
+    """
+    Loads the procedures from the selected repo and creates them in the new repo, either one step after the other or
+    pipelined, based on `pipeline_duplication` in settings.py
+
+    :param source_auth: authentication context of the instance to load procedures from
+    :type source_auth: Auth
+    :param target_auth: authentication context of the instance to create procedures in
+    :type target_auth: Auth
+    :param repo: repository object selected for duplication
+    :type repo: repository object
+    :param repo_id: id of the repository to create the procedures in
+    :type repo_id: str
+    :return: False if the user chose not to continue, otherwise True
+    :rtype: bool
+    """
+    # since loading procedures takes the longest, all user options are selected before
+    # between instances the source and target requests do not compete for the same instance, so loaded procedures are always streamed into creates
+    if settings.pipeline_duplication or target_auth.base_url != source_auth.base_url:
+        return duplicate_procedures_pipelined(source_auth, target_auth, repo, repo_id)
+    procedures = load_procedures_from_instance(source_auth, repo)
+    if procedures == False: # user chose not continue with script execution
+        return False
+    if not input.continue_anyways(f'Load {len(procedures)} procedures into new repository'):
+        return False
+    add_procedures_to_repo(target_auth, repo_id, procedures)
+    return True
+
+
+def load_run_to_resume(target_auth):
+    """
+    Loads the duplication recorded in the journal by a previous run. Exits the script if there is nothing to resume.
+
+    :param target_auth: authentication context of the instance to create procedures in
+    :type target_auth: Auth
+    :return: the source repository object, with only the procedures that have not been created yet, and the id of the
+    repository the procedures are created in
+    :rtype: tuple[repository object, str]
+    """
+    if journal == None or not journal.load():
+        log.critical(f'No duplication to resume, journal \'{settings.journal_file}\' was not found or is empty. Exiting...')
+        exit()
+    if journal.complete:
+        log.success(f'Duplication of \'{journal.repository["name"]}\' in journal \'{settings.journal_file}\' already finished, nothing to resume')
+        exit()
+    if journal.target_instance_url != None and journal.target_instance_url != target_auth.base_url:
+        log.critical(f'Journal \'{settings.journal_file}\' is a duplication to {journal.target_instance_url}, but the target instance is {target_auth.base_url}. Exiting...')
+        exit()
+    repo = dict(journal.repository, procedures=journal.get_remaining_procedures())
+    if journal.snapshot_file != None:
+        log.info(f'Procedures are imported from snapshot \'{journal.snapshot_file}\'')
+    log.success(f'Resuming duplication of \'{repo["name"]}\' repository, {len(journal.created)} procedure(s) already created and {len(repo["procedures"])} remaining')
+    return repo, journal.target_repository_id
+
+
+def export_snapshot(auth, repo, file_path) -> None:
+    """
+    Loads the procedures from the selected repo and writes them to a snapshot file, which can be imported with
+    --import-snapshot any number of times without loading the repo from the instance again.
+
+    Procedures are written to the file as they are loaded, so only the batches being loaded are held in memory.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param repo: repository object selected for export
+    :type repo: repository object
+    :param file_path: path of the snapshot file to write
+    :type file_path: str
+    """
+    # techniques are included so the snapshot can be imported into a different instance
+    techniques = load_techniques(auth)
+    list_procedures = list_procedures_in_repo(auth, repo)
+    log.success(f'Found {len(list_procedures)} procedures from \'{repo["name"]}\' repository, exporting to \'{file_path}\'...')
+    with ThreadPoolExecutor(max_workers=settings.procedure_load_workers) as executor:
+        procedures = load_procedure_details_windowed(auth, list_procedures, executor, settings.procedure_load_workers * 2)
+        count = snapshot_handler.write_snapshot(file_path, repo, (x for x in procedures if x != None), auth.base_url, techniques)
+    log.success(f'Exported {count}/{len(list_procedures)} procedures from \'{repo["name"]}\' repository to \'{file_path}\'')
+
+
+def load_snapshot(file_path):
+    """
+    Opens a snapshot file written with --export-snapshot. Exits the script if the file cannot be read.
+
+    :param file_path: path of the snapshot file
+    :type file_path: str
+    :return: the snapshot header, the repository object the snapshot was exported from, and an iterator that lazily
+    reads its procedures from the file
+    :rtype: tuple[dict, repository object, Iterator[dict]]
+    """
+    try:
+        header, procedures = snapshot_handler.read_snapshot(file_path)
+    except Exception as e:
+        log.exception(e)
+        log.critical(f'Could not read snapshot \'{file_path}\'. Exiting...')
+        exit()
+    repo = dict(header['repository'])
+    repo['procedures'] = repo.get('procedures') or []
+    log.success(f'Opened snapshot of \'{repo["name"]}\' repository with {len(repo["procedures"])} procedures')
+    return header, repo, procedures
+
+
+def create_fan_out_repos(auth, count, target_repositories=None) -> list:
+    """
+    Creates the new repositories procedures are duplicated to with --fan-out. If any repository cannot be created, the
+    repositories already created are deleted before exiting.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param count: number of new repositories to prompt for, ignored if `target_repositories` is given
+    :type count: int
+    :param target_repositories: `target_repositories` from the config, each with a `name`, `shortName` and `description`.
+    values that are missing are prompted for, defaults to None
+    :type target_repositories: list[dict], optional
+    :return: repository objects with the `id` and `name` of each new repository
+    :rtype: list[dict]
+    """
+    if target_repositories == None:
+        target_repositories = [{} for i in range(count)]
+    target_repos = []
+    try:
+        for target_repository in target_repositories:
+            log.info(f'New repository {len(target_repos) + 1} of {len(target_repositories)}')
+            repo_id = create_new_repo(auth, target_repository.get('name'), target_repository.get('shortName'), target_repository.get('description'))
+            target_repos.append({"id": repo_id, "name": target_repository.get('name', repo_id)})
+    except SystemExit:
+        # clean up the repositories already created
+        for target_repo in target_repos:
+            delete_repo(auth, target_repo['id'])
+        raise
+    return target_repos
 
 
+def fan_out_procedures(auth, procedures, target_repos) -> None:
+    """
+    Creates the same procedures in several repositories at the same time, so procedures only need to be loaded from the
+    source once. The units of every repository share one pool of `procedure_create_workers` workers, the number of
+    requests sent to the instance at a time is the same as when creating procedures in a single repository.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param procedures: variables for the POST RunbookProcedureCreateV2 endpoint returned from `load_procedure_detail`
+    :type procedures: list[dict]
+    :param target_repos: repositories returned from `create_fan_out_repos`
+    :type target_repos: list[dict]
+    """
+    log.info(f'Creating {len(procedures)} procedures in {len(target_repos)} new repositories...')
+    units = get_procedure_create_units([remap_techniques(x) for x in procedures])
+    success_counts = {target_repo['id']: 0 for target_repo in target_repos}
+    metrics = IterationMetrics(len(units) * len(target_repos))
+    with ThreadPoolExecutor(max_workers=settings.procedure_create_workers) as executor:
+        # units are submitted repository by repository for each unit, so every repository fills at the same pace
+        futures = {executor.submit(create_procedures_in_order, auth, target_repo['id'], unit): target_repo['id'] for unit in units for target_repo in target_repos}
+        for future in as_completed(futures):
+            success_counts[futures[future]] += future.result()
+            log.info(metrics.print_iter_metrics())
+    for target_repo in target_repos:
+        log.success(f'Added {success_counts[target_repo["id"]]}/{len(procedures)} procedure(s) into \'{target_repo["name"]}\'')
+
+
+def load_snapshot_technique_remap(target_auth, header) -> TechniqueRemap:
+    """
+    Builds the map of technique ids for importing a snapshot, if it was exported from a different instance.
+
+    :param target_auth: authentication context of the instance to create procedures in
+    :type target_auth: Auth
+    :param header: snapshot header returned from `load_snapshot`
+    :type header: dict
+    :return: map of technique ids, or None if technique ids are used as is
+    :rtype: TechniqueRemap
+    """
+    if header.get('instanceUrl') == target_auth.base_url:
+        return None
+    if header.get('techniques') == None:
+        log.warning(f'Snapshot of \'{header["repository"]["name"]}\' does not include techniques, technique ids are used as is and only exist on the instance the snapshot was exported from')
+        return None
+    return load_technique_remap(target_auth, source_techniques=header['techniques'])
+
+
+def import_procedures(auth, repo, procedures, repo_id) -> bool:
+    """
+    Creates procedures read from a snapshot in the new repo as they are read from the file, so the snapshot is never
+    held in memory. Procedures recorded as created in the journal are skipped.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param repo: repository object returned from `load_snapshot`
+    :type repo: repository object
+    :param procedures: procedures iterator returned from `load_snapshot`
+    :type procedures: Iterator[dict]
+    :param repo_id: id of the repository to create the procedures in
+    :type repo_id: str
+    :return: False if the user chose not to continue, otherwise True
+    :rtype: bool
+    """
+    total = len(repo['procedures'])
+    if journal != None:
+        total -= len([x for x in repo['procedures'] if journal.is_created(x['id'])])
+        procedures = (x for x in procedures if not journal.is_created(x['sourceId']))
+    if not input.continue_anyways(f'Load {total} procedures into new repository'):
+        return False
+    log.info(f'Reading and creating procedures in new repository...')
+    loaded_count, skipped_count, success_count = create_procedures_streamed(auth, repo_id, procedures, total)
+    if existing_procedures != None:
+        log.success(f'Skipped {skipped_count} procedure(s) already in the repository')
+    log.success(f'Added {success_count}/{loaded_count - skipped_count} procedure(s) into the new repository')
+    return True
+
+
+def update_procedure(auth, repo_id, target_id, procedure) -> bool:
+    """
+    Updates a copy of a procedure with the current data of the source procedure. Errors are logged and the procedure
+    is skipped.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param repo_id: id of the repository the copy is in
+    :type repo_id: str
+    :param target_id: id of the copy of the procedure
+    :type target_id: str
+    :param procedure: variables for the POST RunbookProcedureCreateV2 endpoint returned from `load_procedure_detail`
+    :type procedure: dict
+    :return: whether the procedure was updated
+    :rtype: bool
+    """
+    log.info(f'Updating procedure \'{procedure["data"]["name"]}\'...')
+    try:
+        variables = dict(procedure, id=target_id)
+        variables['data'] = dict(procedure['data'], repositoryId=repo_id)
+        variables.pop('sourceId', None)
+        response = query_registry.send(api._runbooks._runbooks_v2._runbooksdb.procedures.runbookprocedureupdatev2, auth, "RunbookProcedureUpdateV2", queries.PROCEDURE_UPDATE, variables)
+        log.debug(f'JSON response from update procedure request: {response.json}')
+        if response.json.get("errors") != None:
+            log.error(f'Could not update procedure \'{procedure["data"]["name"]}\': {response.json.get("errors")[0].get("message", "No error message provided")}')
+            return False
+        sync_state.record_synced(procedure['sourceId'], target_id)
+        log.success(f'Updated procedure \'{procedure["data"]["name"]}\'')
+        return True
+    except Exception as e:
+        log.exception(e)
+        log.exception(f'Could not update procedure, skipping...')
+        return False
+
+
+def delete_procedure(auth, source_id) -> bool:
+    """
+    Deletes the copy of a source procedure that was deleted from the source repository. Errors are logged and the
+    procedure is skipped.
+
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param source_id: id of the deleted source procedure
+    :type source_id: str
+    :return: whether the copy was deleted
+    :rtype: bool
+    """
+    target_id = sync_state.get_target_id(source_id)
+    log.info(f'Deleting procedure \'{target_id}\'...')
+    try:
+        response = query_registry.send(api._runbooks._runbooks_v2._runbooksdb.procedures.runbookproceduredeletev2, auth, "RunbookProcedureDeleteV2", queries.PROCEDURE_DELETE, {"id": target_id})
+        log.debug(f'JSON response from delete procedure request: {response.json}')
+        if response.json.get("errors") != None:
+            log.error(f'Could not delete procedure \'{target_id}\': {response.json.get("errors")[0].get("message", "No error message provided")}')
+            return False
+        sync_state.record_deleted(source_id)
+        log.success(f'Deleted procedure \'{target_id}\'')
+        return True
+    except Exception as e:
+        log.exception(e)
+        log.exception(f'Could not delete procedure, skipping...')
+        return False
+
+
+def load_sync_to_continue(source_auth, target_auth):
+    """
+    Loads the repository kept in sync by a previous run with --sync. Exits the script if the state does not match the
+    configured instances or the synced repository no longer exists.
+
+    :param source_auth: authentication context of the instance to load procedures from
+    :type source_auth: Auth
+    :param target_auth: authentication context of the instance to create procedures in
+    :type target_auth: Auth
+    :return: the source repository, with only an `id` and `name`, and the id of the repository procedures are synced to
+    :rtype: tuple[repository object, str]
+    """
+    if sync_state.source_instance_url != None and sync_state.source_instance_url != source_auth.base_url:
+        log.critical(f'Sync state \'{sync_state.file_path}\' syncs from {sync_state.source_instance_url}, but the source instance is {source_auth.base_url}. Exiting...')
+        exit()
+    if sync_state.target_instance_url != None and sync_state.target_instance_url != target_auth.base_url:
+        log.critical(f'Sync state \'{sync_state.file_path}\' syncs to {sync_state.target_instance_url}, but the target instance is {target_auth.base_url}. Exiting...')
+        exit()
+    if next((x for x in load_repos_from_instance(target_auth, include_empty=True) if x['id'] == sync_state.target_repository_id), None) == None:
+        log.critical(f'Could not find the repository procedures are synced to. Delete \'{sync_state.file_path}\' to sync to a new repository. Exiting...')
+        exit()
+    log.success(f'Syncing \'{sync_state.source_repository["name"]}\' repository, {len(sync_state.procedures)} procedure(s) synced by the last run')
+    return sync_state.source_repository, sync_state.target_repository_id
+
+
+def sync_procedures(source_auth, target_auth, repo, repo_id) -> bool:
+    """
+    Brings the synced repository up to date with the source repository. The procedures listed with the source repository
+    are compared with the sync state, using the `updatedAt` from the source procedure list, and details are only loaded
+    for procedures that are new or changed since the last sync. New procedures are created, changed procedures are
+    updated, and copies of procedures deleted from the source repository are deleted. Each synced procedure is recorded
+    in the sync state as soon as it is synced, procedures that could not be synced are tried again by the next run.
+
+    :param source_auth: authentication context of the instance to load procedures from
+    :type source_auth: Auth
+    :param target_auth: authentication context of the instance to create procedures in
+    :type target_auth: Auth
+    :param repo: repository object procedures are synced from
+    :type repo: repository object
+    :param repo_id: id of the repository procedures are synced to
+    :type repo_id: str
+    :return: False if the user chose not to continue, otherwise True
+    :rtype: bool
+    """
+    # the procedures in the repository are the ones listed with it, the procedure list is only used for `updatedAt`
+    source_repo = next((x for x in load_repos_from_instance(source_auth, include_empty=True) if x['id'] == repo['id']), None)
+    if source_repo == None:
+        log.critical(f'Could not find the repository procedures are synced from. Exiting...')
+        exit()
+    log.info(f'Loading procedures from Plextrac instance, this may take awhile...')
+    list_procedures = [x for x in iter_runbook_procedures(source_auth) if x['repository']['id'] == repo['id']]
+    new_procedures, changed_procedures, deleted_ids = sync_state.get_changes([x['id'] for x in source_repo['procedures']], list_procedures)
+    log.success(f'Found {len(new_procedures)} new, {len(changed_procedures)} changed and {len(deleted_ids)} deleted procedure(s) in \'{repo["name"]}\' repository since the last sync')
+    if len(new_procedures) + len(changed_procedures) + len(deleted_ids) == 0:
+        sync_state.save()
+        log.success(f'Synced repository is up to date')
+        return True
+    if not input.continue_anyways(f'Create {len(new_procedures)}, update {len(changed_procedures)} and delete {len(deleted_ids)} procedure(s) in the synced repository'):
+        return False
+
+    try:
+        sync_state.save()
+        # only the details of new and changed procedures are loaded
+        procedures = []
+        batches = general_utils.chunk_list(new_procedures + changed_procedures, settings.procedure_detail_batch_size)
+        with ThreadPoolExecutor(max_workers=settings.procedure_load_workers) as executor:
+            for batch in executor.map(load_procedure_details_batch, [source_auth] * len(batches), batches):
+                procedures += [x for x in batch if x != None]
+        log.success(f'Loaded {len(procedures)}/{len(new_procedures) + len(changed_procedures)} new and changed procedures')
+
+        procedures_to_create = [x for x in procedures if sync_state.get_target_id(x['sourceId']) == None]
+        procedures_to_update = [remap_techniques(x) for x in procedures if sync_state.get_target_id(x['sourceId']) != None]
+        if len(procedures_to_create) > 0:
+            add_procedures_to_repo(target_auth, repo_id, procedures_to_create)
+
+        with ThreadPoolExecutor(max_workers=settings.procedure_create_workers) as executor:
+            update_futures = [executor.submit(update_procedure, target_auth, repo_id, sync_state.get_target_id(x['sourceId']), x) for x in procedures_to_update]
+            delete_futures = [executor.submit(delete_procedure, target_auth, x) for x in deleted_ids]
+            update_count = sum([1 if x.result() else 0 for x in update_futures])
+            delete_count = sum([1 if x.result() else 0 for x in delete_futures])
+        log.success(f'Updated {update_count}/{len(changed_procedures)} and deleted {delete_count}/{len(deleted_ids)} procedure(s) in the synced repository')
+    finally:
+        sync_state.save()
+    return True
+
 
 if __name__ == '__main__':
     for i in settings.script_info:
         print(i)
 
+    parser = argparse.ArgumentParser(description="Duplicates a Runbooks repository")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--resume", action="store_true", help=f'continue the duplication recorded in the journal file set in settings.py by a run that was interrupted')
+    mode.add_argument("--export-snapshot", metavar="FILE", help=f'write the procedures of a repository to a snapshot file instead of duplicating them, e.g. curated.jsonl.gz')
+    mode.add_argument("--import-snapshot", metavar="FILE", help=f'duplicate the procedures in a snapshot file instead of loading them from the instance')
+    mode.add_argument("--sync", metavar="STATE_FILE", nargs="?", const=settings.sync_state_file, help=f'keep a copy of a repository up to date, only creating, updating and deleting procedures that changed since the last sync. the state is saved to STATE_FILE, or the file set in settings.py')
+    parser.add_argument("--skip-existing", action="store_true", help=f'duplicate to an existing repository, only creating procedures that do not already have a copy in it')
+    parser.add_argument("--fan-out", metavar="N", type=int, nargs="?", const=0, help=f'duplicate to N new repositories at once, loading the source procedures only once. without N, the repositories in `target_repositories` in the config are created')
+    cli_args = parser.parse_args()
+    if cli_args.fan_out != None and (cli_args.resume or cli_args.export_snapshot != None or cli_args.skip_existing):
+        parser.error("--fan-out cannot be used with --resume, --export-snapshot or --skip-existing")
+    if cli_args.sync != None and (cli_args.fan_out != None or cli_args.skip_existing):
+        parser.error("--sync cannot be used with --fan-out or --skip-existing")
+
     with open("config.yaml", 'r') as f:
         args = yaml.safe_load(f)
 
-    auth = Auth(args)
-    auth.handle_authentication()
+    # procedures can be duplicated from one instance to another by adding a `source` and `target` section to the config,
+    # otherwise the top level values are used for both
+    source_auth = Auth(args.get('source') or args)
+    target_auth = Auth(args['target']) if args.get('target') != None else source_auth
+    separate_target = target_auth is not source_auth
+    # a snapshot is exported from the source and imported into the target, only authenticate with the instance that is used
+    if cli_args.import_snapshot == None:
+        if separate_target:
+            log.info(f'Authenticating with source instance')
+        source_auth.handle_authentication()
+    if cli_args.export_snapshot == None and (separate_target or cli_args.import_snapshot != None):
+        if separate_target:
+            log.info(f'Authenticating with target instance')
+        target_auth.handle_authentication()
+    # `source` and `target` sections can point at the same instance, e.g. with different users. only a different instance
+    # has different technique ids
+    cross_instance = target_auth.base_url != source_auth.base_url
 
-    # load all repos from instance
-    repos = load_repos_from_instance()
+    # progress is recorded so an interrupted run can be continued with --resume, exporting a snapshot creates nothing to resume
+    # fan-out duplications are not journaled, the journal records a single repository procedures are duplicated to
+    # syncs record their progress in the sync state instead
+    journal = DuplicationJournal(settings.journal_file) if settings.journal_file and cli_args.export_snapshot == None and cli_args.fan_out == None and cli_args.sync == None else None
+    # source and target procedure ids, and when each procedure was last synced, when using --sync
+    sync_state = SyncState(cli_args.sync) if cli_args.sync != None else None
+    # procedures already in the repository procedures are duplicated to, when using --skip-existing
+    existing_procedures = None
+    # technique ids are different on each instance, they are remapped when duplicating to a different instance
+    technique_remap = None
 
-    # prompt user to select a repo for duplication
-    while True:
-        choice = get_repo_choice(repos)
-        if input.continue_anyways(f'Select \'{repos[choice]["name"]}\' to duplicate?'):
-            break
-    selected_repo = repos[choice]
+    if cli_args.resume:
+        # the new repo already exists and may already contain procedures, it is never created or deleted when resuming
+        selected_repo, repo_id = load_run_to_resume(target_auth)
+        if cli_args.skip_existing:
+            # also catches procedures that were created, but not recorded in the journal before the run stopped
+            target_repo = next((x for x in load_repos_from_instance(target_auth, include_empty=True) if x['id'] == repo_id), None)
+            if target_repo == None:
+                log.critical(f'Could not find the repository procedures were being duplicated to. Exiting...')
+                exit()
+            existing_procedures = load_existing_procedures(target_auth, target_repo)
+            if existing_procedures == None:
+                log.info("Exiting...")
+                exit()
+            # copies recorded in the journal were already matched with a source procedure
+            existing_procedures.exclude(journal.created.values())
+        if journal.snapshot_file != None:
+            snapshot_header, snapshot_repo, snapshot_procedures = load_snapshot(journal.snapshot_file)
+            technique_remap = load_snapshot_technique_remap(target_auth, snapshot_header)
+            finished = import_procedures(target_auth, snapshot_repo, snapshot_procedures, repo_id)
+        else:
+            if cross_instance:
+                technique_remap = load_technique_remap(target_auth, source_auth)
+            finished = duplicate_procedures(source_auth, target_auth, selected_repo, repo_id)
+        if not finished:
+            log.info("Exiting...")
+            exit()
+        journal.record_complete()
+        exit()
 
-    # prompt user to create new repo where procedures will be copied to
-    repo_id = create_new_repo()
+    if sync_state != None:
+        new_repo = not sync_state.load()
+        if new_repo:
+            # first sync, every procedure in the selected repo is new and is copied to a new repo
+            repos = load_repos_from_instance(source_auth)
+            while True:
+                choice = get_repo_choice(repos)
+                if input.continue_anyways(f'Select \'{repos[choice]["name"]}\' to sync?'):
+                    break
+            selected_repo = repos[choice]
+            repo_id = create_new_repo(target_auth)
+            sync_state.start(selected_repo, repo_id, source_auth.base_url, target_auth.base_url)
+        else:
+            selected_repo, repo_id = load_sync_to_continue(source_auth, target_auth)
+        if cross_instance:
+            technique_remap = load_technique_remap(target_auth, source_auth)
+        if not sync_procedures(source_auth, target_auth, selected_repo, repo_id) and new_repo:
+            delete_repo(target_auth, repo_id) # delete repo that user newly created since we're exiting early and won't add procedures to it
+        exit()
 
-    # load procedures related to selected repo from instance
-    # since this step takes the longest, all user options are selected before
-    procedures = load_procedures_from_instance(selected_repo)
-    if procedures == False: # user chose not continue with script execution
-        delete_repo(repo_id) # delete repo that user newly created since we're exiting early and won't add procedures to it
-        log.info("Exiting...")
+    if journal != None and journal.load() and not journal.complete:
+        if not input.continue_anyways(f'Journal \'{settings.journal_file}\' has an unfinished duplication of \'{journal.repository["name"]}\' that can be continued with --resume. Starting a new duplication will replace it'):
+            exit()
+
+    if cli_args.import_snapshot != None:
+        # procedures are loaded from the snapshot instead of the instance
+        snapshot_header, selected_repo, snapshot_procedures = load_snapshot(cli_args.import_snapshot)
+    else:
+        # load all repos from instance
+        repos = load_repos_from_instance(source_auth)
+
+        # prompt user to select a repo for duplication
+        while True:
+            choice = get_repo_choice(repos)
+            if input.continue_anyways(f'Select \'{repos[choice]["name"]}\' to {"export" if cli_args.export_snapshot != None else "duplicate"}?'):
+                break
+        selected_repo = repos[choice]
+
+    if cli_args.export_snapshot != None:
+        export_snapshot(source_auth, selected_repo, cli_args.export_snapshot)
         exit()
-    if not input.continue_anyways(f'Load {len(procedures)} procedures into new repository'):
-        delete_repo(repo_id) # delete repo that user newly created since we're exiting early and won't add procedures to it
+
+    if cli_args.fan_out != None:
+        if cli_args.fan_out <= 0 and args.get('target_repositories') == None:
+            log.critical(f'Enter the number of new repositories with --fan-out N, or add `target_repositories` to the config. Exiting...')
+            exit()
+        # prompt user to create each new repo where procedures will be copied to
+        target_repos = create_fan_out_repos(target_auth, cli_args.fan_out, args.get('target_repositories') if cli_args.fan_out <= 0 else None)
+        # the source procedures are loaded once and created in every new repo
+        if cli_args.import_snapshot != None:
+            technique_remap = load_snapshot_technique_remap(target_auth, snapshot_header)
+            # every new repo is created from the same procedures, they are read from the snapshot once and kept
+            procedures = list(snapshot_procedures)
+        else:
+            if cross_instance:
+                technique_remap = load_technique_remap(target_auth, source_auth)
+            procedures = load_procedures_from_instance(source_auth, selected_repo)
+        if procedures == False or not input.continue_anyways(f'Load {len(procedures)} procedures into {len(target_repos)} new repositories'):
+            for target_repo in target_repos:
+                delete_repo(target_auth, target_repo['id']) # delete repos that user newly created since we're exiting early and won't add procedures to them
+            log.info("Exiting...")
+            exit()
+        fan_out_procedures(target_auth, procedures, target_repos)
+        exit()
+
+    if cli_args.skip_existing:
+        # prompt user to select an existing repo where procedures will be copied to
+        target_repos = [x for x in load_repos_from_instance(target_auth, include_empty=True) if x['isEditable'] and x['id'] != selected_repo['id']]
+        if len(target_repos) == 0:
+            log.critical(f'No editable repositories to duplicate procedures to. Exiting...')
+            exit()
+        target_repo = target_repos[get_target_repo_choice(target_repos)]
+        repo_id = target_repo['id']
+        existing_procedures = load_existing_procedures(target_auth, target_repo)
+        if existing_procedures == None:
+            log.info("Exiting...")
+            exit()
+    else:
+        # prompt user to create new repo where procedures will be copied to
+        repo_id = create_new_repo(target_auth)
+    if journal != None:
+        journal.start_run(selected_repo, repo_id, target_auth.base_url, os.path.abspath(cli_args.import_snapshot) if cli_args.import_snapshot != None else None)
+
+    # load procedures related to selected repo from instance, or the snapshot, and add them to the new repo
+    if cli_args.import_snapshot != None:
+        technique_remap = load_snapshot_technique_remap(target_auth, snapshot_header)
+        finished = import_procedures(target_auth, selected_repo, snapshot_procedures, repo_id)
+    else:
+        if cross_instance:
+            technique_remap = load_technique_remap(target_auth, source_auth)
+        finished = duplicate_procedures(source_auth, target_auth, selected_repo, repo_id)
+    if not finished:
+        if not cli_args.skip_existing:
+            delete_repo(target_auth, repo_id) # delete repo that user newly created since we're exiting early and won't add procedures to it
+        if journal != None:
+            journal.discard() # nothing left to resume
         log.info("Exiting...")
         exit()
-    add_procedures_to_repo(repo_id, procedures)
+    if journal != None:
+        journal.record_complete()
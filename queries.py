@@ -0,0 +1,69 @@
+from functools import lru_cache
+
+
+# GraphQL documents sent by the script. Each document is defined once here, so it is sent with the exact same text
+# every time and can be sent as a persisted query by `utils.query_registry`
+
+
+# REPOSITORIES
+REPOSITORY_LIST = "query RunbookRepositoryListV2($args: ListArgs!) {\n   runbookRepositoryListV2(args: $args) {\n     data {\n       ...RunbookRepositoryListDataV2\n       __typename\n     }\n     meta {\n       ...ListMetaData\n       __typename\n     }\n     __typename\n   }\n }\n \n fragment RunbookRepositoryListDataV2 on RunbookRepositoryV2 {\n   id\n   name\n   shortName\n   description\n   type\n   procedures {\n     id\n     __typename\n   }\n   isEditable\n   updatedAt\n   userCount\n   __typename\n }\n \n fragment ListMetaData on ListMeta {\n   pagination {\n     limit\n     offset\n     total\n     __typename\n   }\n   sort {\n     by\n     order\n     __typename\n   }\n   filters {\n     by\n     value\n     __typename\n   }\n   __typename\n }"
+
+REPOSITORY_CREATE = "mutation RunbookRepositoryCreateV2($data: RunbookRepositoryInputV2!) {\n  runbookRepositoryCreateV2(input: $data) {\n    id\n    name\n    shortName\n    description\n    type\n    isEditable\n    __typename\n  }\n}\n"
+
+REPOSITORY_DELETE = "mutation RunbookRepositoryDeleteV2($id: ID!) {\n   runbookRepositoryDeleteV2(id: $id) {\n     id\n     deletedAt\n     __typename\n   }\n }"
+
+
+# PROCEDURES
+PROCEDURE_LIST = "query RunbookProcedureListV2($args: ListArgs!) {\n  runbookProcedureListV2(args: $args) {\n    data {\n      ...RunbookProcedureDataGridV2\n      __typename\n    }\n    meta {\n      ...ListMetaData\n      __typename\n    }\n    __typename\n  }\n}\n\nfragment RunbookProcedureDataGridV2 on RunbookProcedureV2 {\n  id\n  name\n  shortName\n  description\n  isEditable\n  updatedAt\n  deletedAt\n  repository {\n    id\n    name\n    shortName\n    type\n    __typename\n  }\n  techniques {\n    id\n    name\n    shortName\n    methodologies {\n      name\n      shortName\n      __typename\n    }\n    __typename\n  }\n  __typename\n}\n\nfragment ListMetaData on ListMeta {\n  pagination {\n    limit\n    offset\n    total\n    __typename\n  }\n  sort {\n    by\n    order\n    __typename\n  }\n  filters {\n    by\n    value\n    __typename\n  }\n  __typename\n}\n"
+
+# procedures are only loaded and created to duplicate them, so only the fields needed to create a copy are selected,
+# and created procedures only return their id
+PROCEDURE_DUPLICATION_FRAGMENT = "fragment RunbookProcedureDuplicationDataV2 on RunbookProcedureV2 {\n  id\n  name\n  shortName\n  description\n  executionSteps {\n    description\n    successCriteria\n  }\n  techniques {\n    id\n  }\n  tags {\n    tag\n  }\n}\n"
+
+PROCEDURE_DETAIL = "query RunbookProcedureDetailV2($id: ID!) {\n  runbookProcedureV2(id: $id) {\n    ...RunbookProcedureDuplicationDataV2\n  }\n}\n\nfragment RunbookProcedureDuplicationDataV2 on RunbookProcedureV2 {\n  id\n  name\n  shortName\n  description\n  executionSteps {\n    description\n    successCriteria\n  }\n  techniques {\n    id\n  }\n  tags {\n    tag\n  }\n}\n"
+
+PROCEDURE_CREATE = "mutation RunbookProcedureCreateV2($data: RunbookProcedureInputV2!, $executionSteps: [RunbookProcedureExecutionStepInput!]!, $techniqueIds: [ID!], $tags: [String!]) {\n  runbookProcedureCreateV2(\n    input: $data\n    executionSteps: $executionSteps\n    techniqueIds: $techniqueIds\n    tags: $tags\n  ) {\n    id\n  }\n}\n"
+
+# synced procedures are updated and deleted in place, only their id is returned
+PROCEDURE_UPDATE = "mutation RunbookProcedureUpdateV2($id: ID!, $data: RunbookProcedureInputV2!, $executionSteps: [RunbookProcedureExecutionStepInput!]!, $techniqueIds: [ID!], $tags: [String!]) {\n  runbookProcedureUpdateV2(\n    id: $id\n    input: $data\n    executionSteps: $executionSteps\n    techniqueIds: $techniqueIds\n    tags: $tags\n  ) {\n    id\n  }\n}\n"
+
+PROCEDURE_DELETE = "mutation RunbookProcedureDeleteV2($id: ID!) {\n  runbookProcedureDeleteV2(id: $id) {\n    id\n    deletedAt\n  }\n}\n"
+
+
+# TECHNIQUES
+# only the fields techniques are matched on between instances are selected
+TECHNIQUE_LIST = "query RunbookTechniqueListV2($args: ListArgs!) {\n  runbookTechniqueListV2(args: $args) {\n    data {\n      id\n      name\n      shortName\n      methodologies {\n        name\n        shortName\n      }\n    }\n    meta {\n      pagination {\n        limit\n        offset\n        total\n      }\n    }\n  }\n}\n"
+
+
+# BATCHES
+@lru_cache(maxsize=None)
+def get_procedure_detail_batch(size: int) -> str:
+    """
+    Builds a query that loads the details of `size` procedures, each selected under the alias `procedure<i>` with the
+    variable `$id<i>`. Documents are cached by size so every batch of the same size is sent with the same document.
+
+    :param size: number of procedures in the batch
+    :type size: int
+    :return: RunbookProcedureDetailV2Batch query document
+    :rtype: str
+    """
+    variable_defs = ", ".join([f'$id{i}: ID!' for i in range(size)])
+    selections = "\n".join([f'  procedure{i}: runbookProcedureV2(id: $id{i}) {{\n    ...RunbookProcedureDuplicationDataV2\n  }}' for i in range(size)])
+    return f'query RunbookProcedureDetailV2Batch({variable_defs}) {{\n{selections}\n}}\n\n' + PROCEDURE_DUPLICATION_FRAGMENT
+
+
+@lru_cache(maxsize=None)
+def get_procedure_create_batch(size: int) -> str:
+    """
+    Builds a mutation that creates `size` procedures, each created under the alias `procedure<i>` with the variables
+    `$data<i>`, `$executionSteps<i>`, `$techniqueIds<i>` and `$tags<i>`. Documents are cached by size so every batch
+    of the same size is sent with the same document.
+
+    :param size: number of procedures in the batch
+    :type size: int
+    :return: RunbookProcedureCreateV2Batch mutation document
+    :rtype: str
+    """
+    variable_defs = ", ".join([f'$data{i}: RunbookProcedureInputV2!, $executionSteps{i}: [RunbookProcedureExecutionStepInput!]!, $techniqueIds{i}: [ID!], $tags{i}: [String!]' for i in range(size)])
+    selections = "\n".join([f'  procedure{i}: runbookProcedureCreateV2(\n    input: $data{i}\n    executionSteps: $executionSteps{i}\n    techniqueIds: $techniqueIds{i}\n    tags: $tags{i}\n  ) {{\n    id\n  }}' for i in range(size)])
+    return f'mutation RunbookProcedureCreateV2Batch({variable_defs}) {{\n{selections}\n}}\n'
@@ -13,6 +13,102 @@ verify_ssl = True
 # number of times to rety a request before throwing an error. will only throw the last error encountered if
 # number of retries is exceeded. set to 0 to disable retrying requests
 retries = 0
+# max number of retries for each kind of failure. set to None to use the value of `retries`
+connect_error_retries = None # request could not be sent or no response was received
+bad_json_retries = None # response was successful but did not contain valid JSON
+status_code_retries = None # response status code was in `retry_status_codes`
+# failed responses with these status codes are retried, other failed status codes throw an error without retrying
+retry_status_codes = [408, 429, 500, 502, 503, 504]
+# retries wait a random time between 0 and `retry_backoff_base` seconds doubled for each retry, up to `retry_backoff_max` seconds
+retry_backoff_base = 0.5
+retry_backoff_max = 30
+# 429 and 503 responses with a Retry-After header wait the requested time instead, up to `retry_after_max` seconds
+retry_after_max = 120
+# max number of open keep-alive connections kept per Plextrac instance. requests to the same instance reuse these
+# connections instead of doing a new TCP and TLS handshake each time. should be at least the number of concurrent requests
+connection_pool_size = 10
+# max number of open connections per Plextrac instance when using the asyncio transport in utils/async_request_handler.py.
+# when `adaptive_concurrency` is enabled, async requests in flight are also capped by `adaptive_concurrency_max_limit`,
+# which they share with the requests sent from threads
+async_connection_limit = 100
+# compression encodings the instance can use for response bodies, in order of preference. "br" is only requested when the
+# brotli package is installed. set to an empty list to request uncompressed responses
+response_compression = ["br", "gzip", "deflate"]
+# when True, JSON request bodies larger than `compress_request_min_bytes` are gzip compressed. if an instance responds
+# with 415 Unsupported Media Type, requests to that instance are sent uncompressed for the rest of the run
+compress_request_bodies = False
+compress_request_min_bytes = 1024
+# JSON decoder for response bodies. "auto" uses orjson if it is installed and falls back to the standard library json
+# module, "orjson" requires orjson, "json" always uses the standard library
+json_codec = "auto"
+# when True, GraphQL documents are sent as automatic persisted queries. the full document is only sent the first time,
+# after that only its SHA-256 hash is sent. instances that do not support persisted queries are sent full documents
+persisted_queries = False
+
+# CIRCUIT BREAKER
+# after this many failed attempts in a row to the same API endpoint on an instance, requests to that endpoint on that
+# instance fail immediately instead of being sent. set to 0 to disable
+circuit_breaker_failure_threshold = 10
+# seconds requests fail immediately before a single request is sent to check if the endpoint has recovered
+circuit_breaker_reset_timeout = 30
+
+# RATE LIMITING
+# max number of requests per second sent to an instance, shared by every request. GraphQL requests (/graphql) and REST
+# requests (/api/v1, /api/v2) are limited separately. set to 0 to disable rate limiting
+rate_limit_graphql_per_second = 0
+rate_limit_rest_per_second = 0
+# number of requests that can be sent at once after not sending requests for a while, before being paced to the rate above
+rate_limit_graphql_burst = 10
+rate_limit_rest_burst = 10
+
+# ADAPTIVE CONCURRENCY
+# when True, the number of requests in flight to an instance is limited by a controller shared by all threads. the limit
+# is raised while responses are healthy and cut when the instance responds with 429/5xx statuses or latency rises
+adaptive_concurrency = True
+# number of requests allowed in flight to start, and the lowest and highest the limit can be adjusted to. the number of
+# requests in flight is also capped by the worker settings below
+adaptive_concurrency_initial_limit = 5
+adaptive_concurrency_min_limit = 1
+adaptive_concurrency_max_limit = 20
+# the limit is cut when responses get this many times slower than the fastest of the last
+# `adaptive_concurrency_latency_window` successful responses of the same kind from the instance
+adaptive_concurrency_latency_tolerance = 3
+adaptive_concurrency_latency_window = 100
+
+# PAGINATION
+# number of items requested per page when listing items from the instance
+list_page_size = 100
+# number of pages loaded at the same time when listing items. the first page is always loaded alone to get the total
+# number of items, the rest of the pages are loaded concurrently. set to 1 to load pages one at a time
+list_page_workers = 5
+
+# DUPLICATION
+# number of procedure details loaded from the instance at the same time. set to 1 to load procedures one at a time
+procedure_load_workers = 5
+# number of procedure details loaded in a single request. each procedure is selected under its own alias in one query,
+# procedures that fail to load in a batch are retried individually. set to 1 to load each procedure with its own request
+procedure_detail_batch_size = 25
+# number of procedures created in the new repository at the same time. set to 1 to create procedures one at a time
+procedure_create_workers = 5
+# number of procedures created in a single request. each procedure is created under its own alias in one mutation,
+# procedures that fail to be created in a batch are retried individually. set to 1 to create each procedure with its own request
+procedure_create_batch_size = 10
+# procedures with the same `shortName` are displayed in the order they were created. when True, procedures sharing a
+# `shortName` are created one after another in the same order as the source repository. set to False to create every
+# procedure independently, which is faster when the source repository has many procedures with the same `shortName`
+preserve_short_name_order = True
+# when True, procedures are created in the new repository while the rest are still being loaded, instead of loading every
+# procedure before creating any. memory use stays constant regardless of the size of the repository
+pipeline_duplication = False
+# max number of loaded procedures waiting to be created at a time when `pipeline_duplication` is enabled. with
+# `preserve_short_name_order` each worker creating procedures gets an equal share, at least one
+pipeline_queue_size = 50
+# JSONL file the progress of each duplication is recorded in. if a run is interrupted, run the script again with --resume
+# to continue where it stopped without loading the source procedures again. set to None to disable
+journal_file = "duplication_journal.jsonl"
+# JSONL file the state of a repository kept in sync with --sync is saved to, when no file is given on the command line.
+# use a different file for each repository that is synced
+sync_state_file = "sync_state.jsonl"
 
 # description of script that will be print line by line when the script is run
 script_info = ["====================================================================",
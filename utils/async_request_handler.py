@@ -0,0 +1,254 @@
+from __future__ import annotations
+import asyncio
+from typing import Dict
+import time
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+import settings
+import utils.log_handler as logger
+log = logger.log
+# imported as a module since request_handler imports the api package, which imports this module
+import utils.request_handler as request_handler
+
+from api.exceptions import *
+
+
+# asyncio counterpart to `utils.request_handler`. requests go through the same retry policy, rate limit buckets and
+# concurrency controllers as the synchronous wrappers, so limits for an instance are shared by both transports
+
+
+# one session per PT instance, bound to the event loop it was created in
+_sessions: Dict[str, "aiohttp.ClientSession"] = {}
+
+def get_session(base_url: str) -> "aiohttp.ClientSession":
+    """
+    Returns the session used for all async requests sent to `base_url`, creating it on first use.
+    Must be called from inside a running event loop.
+
+    The max number of open connections is set with `async_connection_limit` in settings.py
+
+    :param base_url: URL to PT instance including protocol (ex. https://example.plextrac.com)
+    :type base_url: str
+    :raises PTWrapperLibraryException: aiohttp is not installed
+    :return: session with a connection pool for the instance
+    :rtype: aiohttp.ClientSession
+    """
+    if aiohttp == None:
+        raise PTWrapperLibraryException("The async transport requires the aiohttp package. Run `pipenv install` to install it")
+    session = _sessions.get(base_url)
+    if session == None or session.closed:
+        connector = aiohttp.TCPConnector(limit=settings.async_connection_limit, ssl=None if settings.verify_ssl else False)
+        session = aiohttp.ClientSession(connector=connector)
+        _sessions[base_url] = session
+    return session
+
+async def close_sessions() -> None:
+    """
+    Closes all async sessions and their open connections. Should be awaited before the event loop is closed
+    """
+    for session in _sessions.values():
+        await session.close()
+    _sessions.clear()
+
+async def _do(http_method: str, base_url: str, headers: dict, endpoint: str, name: str, data: Dict = None) -> request_handler.PTWrapperLibraryResponse:
+    """
+    Async version of `utils.request_handler._do`. Multipart file uploads are not supported.
+
+    :param http_method: HTTP method, GET, POST, PUT, DELETE
+    :type http_method: str
+    :param base_url: URL to PT instance including protocol (ex. https://example.plextrac.com)
+    :type base_url: str
+    :param headers: dictionary of request headers
+    :type headers: dict
+    :param endpoint: endpoint will be concatenated to `base_url` as the URL to send the request to
+    :type endpoint: str
+    :param name: name of API endpoint, mentioned during exceptions
+    :type name: str
+    :param data: request payload, defaults to None
+    :type data: Dict, optional
+    :raises PTWrapperLibraryException: general request failure
+    :raises PTWrapperLibraryJSONResponse: request doesn't return JSON data
+    :raises PTWrapperLibraryFailed: non 200 response
+    :raises PTWrapperLibraryCircuitOpen: too many requests to this endpoint failed recently, request was not sent
+    :return: custom wrapper for the response, `response` is the aiohttp.ClientResponse with its body already read
+    :rtype: PTWrapperLibraryResponse
+    """
+    full_url = base_url + endpoint
+    log_line_pre = f"method={http_method}, url={full_url}"
+    log_line_post = ', '.join((log_line_pre, "success={}, status_code={}, message={}"))
+
+    session = get_session(base_url)
+    controller = request_handler.get_concurrency_controller(base_url) if settings.adaptive_concurrency else None
+    latency_key = f'{name}:{data.get("operationName")}' if isinstance(data, dict) else name
+    bucket = request_handler.get_rate_limit_bucket(base_url, endpoint)
+    breaker = request_handler.get_circuit_breaker(base_url, name)
+    retries = {error_class: 0 for error_class in request_handler.RetryPolicy.ERROR_CLASSES}
+    attempt = 0
+    probe = None
+    try:
+        while True:
+            if breaker != None:
+                breaker.release_probe(probe)
+                probe = breaker.before_request()
+            if bucket != None:
+                wait = bucket.reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            if controller != None:
+                await controller.acquire_async()
+            request_body, body_headers = request_handler.encode_request_body(base_url, data)
+            request_headers = dict(headers, **body_headers)
+            request_headers["Accept-Encoding"] = request_handler.get_accept_encoding()
+            start_time = time.time()
+            status_code = None
+            request_error = None
+            try:
+                log.debug(log_line_pre)
+                request_data = {"data": request_body} if request_body != None else {"json": data}
+                async with session.request(method=http_method, url=full_url, headers=request_headers, **request_data) as response:
+                    response_body = await response.read()
+                    status_code = response.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                request_error = e
+            finally:
+                if controller != None:
+                    controller.release(time.time() - start_time, status_code, latency_key)
+            if request_error != None:
+                if breaker != None:
+                    breaker.record_failure()
+                if request_handler.retry_policy.should_retry(request_handler.RetryPolicy.CONNECT_ERROR, retries[request_handler.RetryPolicy.CONNECT_ERROR]):
+                    retries[request_handler.RetryPolicy.CONNECT_ERROR] += 1
+                    log.exception(f'Request failed - {name}. Retrying... ({retries[request_handler.RetryPolicy.CONNECT_ERROR]}/{request_handler.retry_policy.max_retries[request_handler.RetryPolicy.CONNECT_ERROR]})\nException: {str(request_error)}')
+                    await asyncio.sleep(request_handler.retry_policy.get_backoff(attempt))
+                    attempt += 1
+                    continue
+                else:
+                    raise PTWrapperLibraryException(f'Request failed - {name}') from request_error
+            # If status_code not in 200-299 range, retry if the status code is retryable, otherwise raise exception
+            is_success = 299 >= status_code >= 200
+            log_line = log_line_post.format(is_success, status_code, response.reason)
+            if not is_success:
+                if request_handler.handle_compression_rejected(base_url, status_code, request_body != None):
+                    continue
+                if breaker != None:
+                    if status_code in request_handler.retry_policy.retry_status_codes:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                if request_handler.retry_policy.should_retry(request_handler.RetryPolicy.STATUS_CODE, retries[request_handler.RetryPolicy.STATUS_CODE], status_code):
+                    retries[request_handler.RetryPolicy.STATUS_CODE] += 1
+                    log.exception(log_line)
+                    retry_after = None
+                    if status_code in (429, 503):
+                        retry_after = request_handler.parse_retry_after(response.headers.get("Retry-After"))
+                    await asyncio.sleep(request_handler.retry_policy.get_backoff(attempt, retry_after))
+                    attempt += 1
+                    continue
+                else:
+                    log.exception(log_line)
+                    raise PTWrapperLibraryFailed(f'{name} - {status_code}: {response.reason}')
+            # Bodies declared as JSON are decoded lazily by PTWrapperLibraryResponse, see `utils.request_handler._do`
+            if "json" in response.headers.get("Content-Type", "").lower():
+                if breaker != None:
+                    breaker.record_success()
+                log.debug(log_line)
+                return request_handler.PTWrapperLibraryResponse(response, status_code, message=response.reason, content=response_body)
+            try:
+                data_out = request_handler.json_loads(response_body)
+            except request_handler.JSON_DECODE_ERRORS as e:
+                if breaker != None:
+                    breaker.record_failure()
+                if request_handler.retry_policy.should_retry(request_handler.RetryPolicy.BAD_JSON, retries[request_handler.RetryPolicy.BAD_JSON]):
+                    retries[request_handler.RetryPolicy.BAD_JSON] += 1
+                    log.exception(log_line_post.format(False, status_code, e))
+                    await asyncio.sleep(request_handler.retry_policy.get_backoff(attempt))
+                    attempt += 1
+                    continue
+                else:
+                    raise PTWrapperLibraryJSONResponse(f'Bad JSON response - {name}') from e
+            if breaker != None:
+                breaker.record_success()
+            log.debug(log_line)
+            return request_handler.PTWrapperLibraryResponse(response, status_code, message=response.reason, json=data_out)
+    finally:
+        # a probe that ended without recording a success or failure would keep the circuit half-open forever
+        if breaker != None:
+            breaker.release_probe(probe)
+
+async def get(base_url: str, headers: dict, endpoint: str, name: str) -> request_handler.PTWrapperLibraryResponse:
+    """
+    Async GET request wrapper
+
+    :param base_url: URL to PT instance including protocol (ex. https://example.plextrac.com)
+    :type base_url: str
+    :param headers: dictionary of request headers
+    :type headers: dict
+    :param endpoint: endpoint will be concatenated to `base_url` as the URL to send the request to
+    :type endpoint: str
+    :param name: name of API endpoint, mentioned during exceptions
+    :type name: str
+    :return: custom wrapper for the response
+    :rtype: PTWrapperLibraryResponse
+    """
+    return await _do(http_method='GET', base_url=base_url, headers=headers, endpoint=endpoint, name=name)
+
+async def post(base_url: str, headers: dict, endpoint: str, name: str, data: Dict = None) -> request_handler.PTWrapperLibraryResponse:
+    """
+    Async POST request wrapper
+
+    :param base_url: URL to PT instance including protocol (ex. https://example.plextrac.com)
+    :type base_url: str
+    :param headers: dictionary of request headers
+    :type headers: dict
+    :param endpoint: endpoint will be concatenated to `base_url` as the URL to send the request to
+    :type endpoint: str
+    :param name: name of API endpoint, mentioned during exceptions
+    :type name: str
+    :param data: request payload, defaults to None
+    :type data: Dict, optional
+    :return: custom wrapper for the response
+    :rtype: PTWrapperLibraryResponse
+    """
+    return await _do(http_method='POST', base_url=base_url, headers=headers, endpoint=endpoint, name=name, data=data)
+
+async def put(base_url: str, headers: dict, endpoint: str, name: str, data: Dict = None) -> request_handler.PTWrapperLibraryResponse:
+    """
+    Async PUT request wrapper
+
+    :param base_url: URL to PT instance including protocol (ex. https://example.plextrac.com)
+    :type base_url: str
+    :param headers: dictionary of request headers
+    :type headers: dict
+    :param endpoint: endpoint will be concatenated to `base_url` as the URL to send the request to
+    :type endpoint: str
+    :param name: name of API endpoint, mentioned during exceptions
+    :type name: str
+    :param data: request payload, defaults to None
+    :type data: Dict, optional
+    :return: custom wrapper for the response
+    :rtype: PTWrapperLibraryResponse
+    """
+    return await _do(http_method='PUT', base_url=base_url, headers=headers, endpoint=endpoint, name=name, data=data)
+
+async def delete(base_url: str, headers: dict, endpoint: str, name: str, data: Dict = None) -> request_handler.PTWrapperLibraryResponse:
+    """
+    Async DELETE request wrapper
+
+    :param base_url: URL to PT instance including protocol (ex. https://example.plextrac.com)
+    :type base_url: str
+    :param headers: dictionary of request headers
+    :type headers: dict
+    :param endpoint: endpoint will be concatenated to `base_url` as the URL to send the request to
+    :type endpoint: str
+    :param name: name of API endpoint, mentioned during exceptions
+    :type name: str
+    :param data: request payload, defaults to None
+    :type data: Dict, optional
+    :return: custom wrapper for the response
+    :rtype: PTWrapperLibraryResponse
+    """
+    return await _do(http_method='DELETE', base_url=base_url, headers=headers, endpoint=endpoint, name=name, data=data)
@@ -1,5 +1,6 @@
 from getpass import getpass
 import json
+import threading
 import time
 
 import utils.log_handler as logger
@@ -18,6 +19,8 @@ class Auth():
         self.auth_headers = {}
 
         self.time_since_last_auth = None
+        # procedures are loaded and created from multiple threads, only one of them should re-authenticate at a time
+        self._auth_lock = threading.RLock()
 
 
     def add_auth_header(self, authorization_token):
@@ -35,13 +38,14 @@ class Auth():
         to prevent the auth from timing out after it was checked, but before it can be received by the API,
         checks whether we are in the last minute of the 15 min auth window
         """
-        if self.time_since_last_auth == None:
-            self.handle_authentication()
+        with self._auth_lock:
+            if self.time_since_last_auth == None:
+                self.handle_authentication()
 
-        if time.time() - self.time_since_last_auth > 840:
-            self.handle_authentication()
-        
-        return self.auth_headers
+            if time.time() - self.time_since_last_auth > 840:
+                self.handle_authentication()
+
+            return dict(self.auth_headers)
 
 
     def handle_instance_url(self):
@@ -37,6 +37,20 @@ def add_tag(list: List[str], tag: str) -> None:
     if new_tag not in list:
         list.append(new_tag)
 
+def chunk_list(list: list, size: int) -> List[list]:
+    """
+    Splits a list into consecutive chunks of at most `size` items, keeping the order of the items
+
+    :param list: list to split
+    :type list: list
+    :param size: max number of items in each chunk, values less than 1 are treated as 1
+    :type size: int
+    :return: list of chunks
+    :rtype: List[list]
+    """
+    size = max(1, size)
+    return [list[i:i+size] for i in range(0, len(list), size)]
+
 def try_parsing_date(possible_date_str: str) -> time.struct_time:
     """
     Try to parse a date string into Python time module's struct_time using several formats.
@@ -0,0 +1,108 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List
+
+import utils.log_handler as logger
+log = logger.log
+import utils.query_registry as query_registry
+
+
+def get_list_field(operation_name: str) -> str:
+    """
+    Returns the name of the field a V2 list query returns its data under. This is the operation name with the first
+    letter lowercased, e.g. `RunbookProcedureListV2` returns its data under `runbookProcedureListV2`
+
+    :param operation_name: name of the GraphQL operation
+    :type operation_name: str
+    :return: name of the field in the response data
+    :rtype: str
+    """
+    return operation_name[0].lower() + operation_name[1:]
+
+
+def get_page_v2(list_request: Callable, auth, operation_name: str, query: str, args: dict, limit: int, offset: int) -> dict:
+    """
+    Gets a single page from a V2 list query that takes `ListArgs`
+
+    :param list_request: api wrapper function that sends the list query, e.g. `runbookprocedurelistv2`
+    :type list_request: Callable
+    :param auth: authentication context of the instance to send the request to
+    :type auth: Auth
+    :param operation_name: name of the GraphQL operation in `query`
+    :type operation_name: str
+    :param query: GraphQL query document
+    :type query: str
+    :param args: `ListArgs` to send with the query, excluding pagination
+    :type args: dict
+    :param limit: number of items in the page
+    :type limit: int
+    :param offset: number of items to skip before the page
+    :type offset: int
+    :raises Exception: the response did not contain the list data
+    :return: the list data of the response, shaped like {"data": [items], "meta": {"pagination": {"total": int, ...}, ...}}
+    :rtype: dict
+    """
+    page_args = dict(args, pagination={"limit": limit, "offset": offset})
+    response = query_registry.send(list_request, auth, operation_name, query, {"args": page_args})
+    list_data = response.json.get("data", {}).get(get_list_field(operation_name)) if response.has_json_response else None
+    if list_data == None:
+        raise Exception(f'Could not retrieve page at offset {offset} - {operation_name}')
+    return list_data
+
+
+def iter_pages_v2(list_request: Callable, auth, operation_name: str, query: str, args: dict, page_size: int = 100, max_workers: int = 1) -> Iterator[dict]:
+    """
+    Lazily yields every item from a V2 list query that takes `ListArgs`, page by page.
+
+    The first page is loaded to get the total number of items from `meta.pagination.total`. Since every remaining
+    offset is then known, the following pages are loaded ahead concurrently by up to `max_workers` threads. Pages are
+    yielded in order and only the pages being loaded are held in memory, so callers can filter and process items as a
+    stream without holding the whole list.
+
+    :param list_request: api wrapper function that sends the list query, e.g. `runbookprocedurelistv2`
+    :type list_request: Callable
+    :param auth: authentication context of the instance to send the requests to
+    :type auth: Auth
+    :param operation_name: name of the GraphQL operation in `query`
+    :type operation_name: str
+    :param query: GraphQL query document
+    :type query: str
+    :param args: `ListArgs` to send with the query, excluding pagination
+    :type args: dict
+    :param page_size: number of items requested per page, defaults to 100
+    :type page_size: int, optional
+    :param max_workers: max number of pages loaded at the same time, defaults to 1
+    :type max_workers: int, optional
+    :raises Exception: a page could not be retrieved
+    :yield: each item, in the same order the instance returned them
+    :rtype: Iterator[dict]
+    """
+    first_page = get_page_v2(list_request, auth, operation_name, query, args, page_size, 0)
+    total = first_page.get("meta", {}).get("pagination", {}).get("total", len(first_page.get("data", [])))
+    log.debug(f'{operation_name} total: {total}')
+    yield from first_page.get("data", [])
+    del first_page
+
+    max_workers = max(1, max_workers)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        pending = deque()
+        for offset in range(page_size, total, page_size):
+            pending.append(executor.submit(get_page_v2, list_request, auth, operation_name, query, args, page_size, offset))
+            if len(pending) >= max_workers:
+                yield from pending.popleft().result().get("data", [])
+        while len(pending) > 0:
+            yield from pending.popleft().result().get("data", [])
+    finally:
+        # stops loading pages if the caller stops iterating early
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def get_all_pages_v2(list_request: Callable, auth, operation_name: str, query: str, args: dict, page_size: int = 100, max_workers: int = 1) -> List[dict]:
+    """
+    Gets every item from a V2 list query that takes `ListArgs`. See `iter_pages_v2`
+
+    :return: list of all items, in the same order the instance returned them
+    :rtype: List[dict]
+    """
+    return list(iter_pages_v2(list_request, auth, operation_name, query, args, page_size, max_workers))
@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+from typing import Dict, List, Set
+
+import utils.log_handler as logger
+log = logger.log
+
+
+class DuplicationJournal():
+    """
+    An append-only JSONL file recording the progress of a duplication, so an interrupted run can be resumed without
+    loading the source data again or creating procedures that were already created.
+
+    Each line is one record:
+    - {"type": "run", "repository": {...}, "target_repository_id": str, "target_instance_url": str, "snapshot": str} the
+    source repo and the repo being duplicated to. `snapshot` is the path of the snapshot file procedures are imported
+    from, or None
+    - {"type": "detail", "source_id": str, "procedure": {...}} the loaded details of a source procedure
+    - {"type": "created", "source_id": str, "target_id": str} a source procedure that was created in the target repo
+    - {"type": "complete"} every procedure was processed
+
+    Lines are flushed as soon as they are written. A procedure whose create request was sent but not recorded before
+    the run stopped is not known to be created, and will be created again when the run is resumed.
+
+    Details written during a run are not kept in memory, only their ids, so recording a run doesn't hold every loaded
+    procedure. Details are only held when loaded from the file to resume a run.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.repository: dict = None
+        self.target_repository_id: str = None
+        self.target_instance_url: str = None
+        self.snapshot_file: str = None
+        self.details: Dict[str, dict] = {}
+        self.detail_ids: Set[str] = set()
+        self.created: Dict[str, str] = {}
+        self.complete = False
+        self.file = None
+        self.lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.file_path)
+
+    def load(self) -> bool:
+        """
+        Loads the records of a previous run from the journal file. A partially written last line, left when the run
+        was stopped mid write, is ignored.
+
+        :return: whether the journal contained a run to resume
+        :rtype: bool
+        """
+        if not self.exists():
+            return False
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip() == "":
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    log.warning(f'Ignoring unreadable line {line_number} in journal \'{self.file_path}\'')
+                    continue
+                self._apply(record)
+        log.debug(f'Loaded journal with {len(self.detail_ids)} procedure details and {len(self.created)} created procedures')
+        return self.repository != None
+
+    def _apply(self, record: dict, keep_detail: bool = True) -> None:
+        record_type = record.get("type")
+        if record_type == "run":
+            self.repository = record["repository"]
+            self.target_repository_id = record["target_repository_id"]
+            self.target_instance_url = record.get("target_instance_url")
+            self.snapshot_file = record.get("snapshot")
+        elif record_type == "detail":
+            self.detail_ids.add(record["source_id"])
+            if keep_detail:
+                self.details[record["source_id"]] = record["procedure"]
+        elif record_type == "created":
+            self.created[record["source_id"]] = record["target_id"]
+        elif record_type == "complete":
+            self.complete = True
+
+    def _write(self, record: dict) -> None:
+        with self.lock:
+            if self.file == None:
+                self.file = open(self.file_path, 'a', encoding='utf-8')
+                # a partially written last line is left as is, new records start on their own line
+                if self.file.tell() > 0 and not self._ends_with_newline():
+                    self.file.write("\n")
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+            self._apply(record, keep_detail=False)
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.file_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def start_run(self, repository: dict, target_repository_id: str, target_instance_url: str = None, snapshot_file: str = None) -> None:
+        """
+        Starts a new journal, replacing the records of any previous run
+
+        :param repository: repository object selected for duplication, the list of procedure ids is kept so the source
+        repo does not need to be loaded again when resuming
+        :type repository: repository object
+        :param target_repository_id: id of the repository procedures are created in
+        :type target_repository_id: str
+        :param target_instance_url: url of the instance the repository procedures are created in is on, defaults to None
+        :type target_instance_url: str, optional
+        :param snapshot_file: absolute path of the snapshot file procedures are imported from, defaults to None
+        :type snapshot_file: str, optional
+        """
+        with self.lock:
+            if self.file != None:
+                self.file.close()
+            self.file = open(self.file_path, 'w', encoding='utf-8')
+            self.details = {}
+            self.detail_ids = set()
+            self.created = {}
+            self.complete = False
+        repository = {"id": repository["id"], "name": repository["name"], "procedures": [{"id": x["id"]} for x in repository["procedures"]]}
+        self._write({"type": "run", "repository": repository, "target_repository_id": target_repository_id, "target_instance_url": target_instance_url, "snapshot": snapshot_file})
+
+    def record_detail(self, source_id: str, procedure: dict) -> None:
+        self._write({"type": "detail", "source_id": source_id, "procedure": procedure})
+
+    def record_created(self, source_id: str, target_id: str) -> None:
+        self._write({"type": "created", "source_id": source_id, "target_id": target_id})
+
+    def record_complete(self) -> None:
+        self._write({"type": "complete"})
+
+    def get_detail(self, source_id: str) -> dict:
+        """
+        :param source_id: id of the source procedure
+        :type source_id: str
+        :return: details of the procedure loaded from the journal file by `load`, or None. details recorded by the current
+        run are not kept
+        :rtype: dict
+        """
+        return self.details.get(source_id)
+
+    def is_created(self, source_id: str) -> bool:
+        return source_id in self.created
+
+    def get_remaining_procedures(self) -> List[dict]:
+        """
+        :return: procedure items of the journaled source repository that have not been created yet, in source order
+        :rtype: List[dict]
+        """
+        return [x for x in self.repository["procedures"] if not self.is_created(x["id"])]
+
+    def discard(self) -> None:
+        """
+        Deletes the journal file, when the run it records was abandoned and there is nothing to resume
+        """
+        self.close()
+        if self.exists():
+            os.remove(self.file_path)
+
+    def close(self) -> None:
+        with self.lock:
+            if self.file != None:
+                self.file.close()
+                self.file = None
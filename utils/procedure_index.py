@@ -0,0 +1,80 @@
+import json
+import threading
+from collections import defaultdict, deque
+from hashlib import sha256
+from typing import Dict, Iterable, Tuple
+
+import utils.log_handler as logger
+log = logger.log
+
+
+def get_procedure_fingerprint(procedure: dict) -> Tuple[str, str, str, Tuple[str, ...]]:
+    """
+    Gets a fingerprint of the content of a procedure, used to tell if a copy of a procedure already exists in a
+    repository. Procedures with the same name, shortName, execution steps and techniques have the same fingerprint.
+
+    :param procedure: variables for the POST RunbookProcedureCreateV2 endpoint returned from `format_procedure_detail`
+    :type procedure: dict
+    :return: name, shortName, SHA-256 hash of the execution steps, and sorted technique ids
+    :rtype: Tuple[str, str, str, Tuple[str, ...]]
+    """
+    steps = [{"description": x.get('description'), "successCriteria": x.get('successCriteria')} for x in procedure['executionSteps']]
+    steps_hash = sha256(json.dumps(steps, sort_keys=True).encode('utf-8')).hexdigest()
+    return (procedure['data']['name'], procedure['data']['shortName'], steps_hash, tuple(sorted(procedure['techniqueIds'])))
+
+
+class ProcedureIndex():
+    """
+    Index of the procedures already in a repository, by content fingerprint.
+
+    Each existing procedure can be claimed by one source procedure, so if the source repository has two identical
+    procedures and the target repository has one copy, only one of the source procedures is skipped.
+    """
+
+    def __init__(self, procedures: Iterable[dict] = []):
+        self.procedures: Dict[tuple, deque] = defaultdict(deque)
+        self.size = 0
+        self.lock = threading.Lock()
+        for procedure in procedures:
+            self.add(procedure)
+
+    def add(self, procedure: dict) -> None:
+        """
+        :param procedure: existing procedure formatted by `format_procedure_detail`, the `sourceId` is the id of the
+        existing procedure
+        :type procedure: dict
+        """
+        with self.lock:
+            self.procedures[get_procedure_fingerprint(procedure)].append(procedure.get('sourceId'))
+            self.size += 1
+
+    def exclude(self, procedure_ids: Iterable[str]) -> None:
+        """
+        Removes existing procedures from the index, so they are never claimed
+
+        :param procedure_ids: ids of existing procedures that are already accounted for
+        :type procedure_ids: Iterable[str]
+        """
+        procedure_ids = set(procedure_ids)
+        with self.lock:
+            for fingerprint, existing in self.procedures.items():
+                kept = deque([x for x in existing if x not in procedure_ids])
+                self.size -= len(existing) - len(kept)
+                self.procedures[fingerprint] = kept
+
+    def claim(self, procedure: dict) -> str:
+        """
+        Finds an unclaimed existing procedure with the same content as `procedure` and marks it as claimed
+
+        :param procedure: source procedure formatted by `format_procedure_detail`
+        :type procedure: dict
+        :return: id of the existing procedure, or None if there is no unclaimed copy of the procedure
+        :rtype: str
+        """
+        fingerprint = get_procedure_fingerprint(procedure)
+        with self.lock:
+            existing = self.procedures.get(fingerprint)
+            if existing == None or len(existing) == 0:
+                return None
+            self.size -= 1
+            return existing.popleft()
@@ -0,0 +1,162 @@
+from hashlib import sha256
+import threading
+from typing import Callable, Dict
+
+import settings
+import utils.log_handler as logger
+log = logger.log
+
+
+class QueryRegistry():
+    """
+    A class to store GraphQL documents once, identified by the SHA-256 hash of their text, and send them as automatic
+    persisted queries (APQ).
+
+    The first time a document is sent to an instance, the full text is sent along with its hash, which registers the
+    document with the instance. After that, only the hash is sent. If the instance no longer knows the hash, the
+    full text is sent again. If the instance does not support persisted queries, documents are sent normally for the
+    rest of the run. An instance that ignores the hash doesn't say so until a request without the full text is sent, so
+    any request with only the hash that fails without returning data is treated the same way.
+
+    Persisted queries are enabled with `persisted_queries` in settings.py
+    """
+    NOT_FOUND = "PERSISTED_QUERY_NOT_FOUND"
+    NOT_SUPPORTED = "PERSISTED_QUERY_NOT_SUPPORTED"
+
+    def __init__(self):
+        self.documents: Dict[str, str] = {} # hash -> document text
+        self.hashes: Dict[str, str] = {} # document text -> hash
+        self.persisted = set() # (base_url, hash) of documents the instance knows
+        self.unsupported_instances = set()
+        self.lock = threading.Lock()
+
+    def register(self, query: str) -> str:
+        """
+        Stores a GraphQL document, if it isn't already stored
+
+        :param query: GraphQL document
+        :type query: str
+        :return: SHA-256 hash identifying the document
+        :rtype: str
+        """
+        with self.lock:
+            query_hash = self.hashes.get(query)
+            if query_hash == None:
+                query_hash = sha256(query.encode('utf-8')).hexdigest()
+                self.hashes[query] = query_hash
+                self.documents[query_hash] = query
+            return query_hash
+
+    def get_query(self, query_hash: str) -> str:
+        """
+        :param query_hash: SHA-256 hash returned from `register`
+        :type query_hash: str
+        :return: the stored GraphQL document
+        :rtype: str
+        """
+        return self.documents[query_hash]
+
+    def build_payload(self, operation_name: str, query: str, variables: dict, send_query: bool = True, persist: bool = True) -> dict:
+        """
+        :param operation_name: name of the GraphQL operation in `query`
+        :type operation_name: str
+        :param query: GraphQL document
+        :type query: str
+        :param variables: variables for the operation
+        :type variables: dict
+        :param send_query: whether to include the full document text, defaults to True
+        :type send_query: bool, optional
+        :param persist: whether to include the persisted query hash, defaults to True
+        :type persist: bool, optional
+        :return: request payload
+        :rtype: dict
+        """
+        payload = {"operationName": operation_name, "variables": variables}
+        if send_query:
+            payload["query"] = query
+        if persist:
+            payload["extensions"] = {"persistedQuery": {"version": 1, "sha256Hash": self.register(query)}}
+        return payload
+
+    def send(self, request: Callable, auth, operation_name: str, query: str, variables: dict):
+        """
+        Sends a GraphQL operation with an api wrapper function, as a persisted query when enabled.
+
+        :param request: api wrapper function that sends the payload, e.g. `runbookproceduredetailv2`
+        :type request: Callable
+        :param auth: authentication context of the instance to send the request to
+        :type auth: Auth
+        :param operation_name: name of the GraphQL operation in `query`
+        :type operation_name: str
+        :param query: GraphQL document
+        :type query: str
+        :param variables: variables for the operation
+        :type variables: dict
+        :return: response from the api wrapper function
+        :rtype: PTWrapperLibraryResponse
+        """
+        base_url = auth.base_url
+        if not settings.persisted_queries or base_url in self.unsupported_instances:
+            return request(base_url, auth.get_auth_headers(), self.build_payload(operation_name, query, variables, persist=False))
+
+        query_hash = self.register(query)
+        if (base_url, query_hash) in self.persisted:
+            # a request with only the hash is rejected before the operation runs, so it is safe to resend if it fails
+            try:
+                response = request(base_url, auth.get_auth_headers(), self.build_payload(operation_name, query, variables, send_query=False))
+                error_codes = self.get_error_codes(response)
+                failed = self.NOT_FOUND in error_codes or response.json.get("data") == None
+            except Exception as e:
+                log.debug(f'Persisted query {operation_name} failed on {base_url}: {e}')
+                error_codes = set()
+                failed = True
+            if not failed:
+                return response
+            if self.NOT_FOUND in error_codes:
+                log.debug(f'Persisted query {operation_name} not found on {base_url}, resending full query')
+                with self.lock:
+                    self.persisted.discard((base_url, query_hash))
+            else:
+                # an instance that ignores `extensions` accepts the full query, but rejects every request without it
+                log.warning(f'{base_url} rejected persisted query {operation_name}, sending full queries')
+                with self.lock:
+                    self.unsupported_instances.add(base_url)
+                return request(base_url, auth.get_auth_headers(), self.build_payload(operation_name, query, variables, persist=False))
+
+        response = request(base_url, auth.get_auth_headers(), self.build_payload(operation_name, query, variables))
+        if self.NOT_SUPPORTED in self.get_error_codes(response):
+            log.warning(f'{base_url} does not support persisted queries, sending full queries')
+            with self.lock:
+                self.unsupported_instances.add(base_url)
+            return request(base_url, auth.get_auth_headers(), self.build_payload(operation_name, query, variables, persist=False))
+        with self.lock:
+            self.persisted.add((base_url, query_hash))
+        return response
+
+    def get_error_codes(self, response) -> set:
+        """
+        :param response: response to a GraphQL request
+        :type response: PTWrapperLibraryResponse
+        :return: persisted query error codes in the response, matched by either the error code or message
+        :rtype: set
+        """
+        codes = set()
+        if not response.has_json_response:
+            return codes
+        for error in response.json.get("errors") or []:
+            code = (error.get("extensions") or {}).get("code")
+            message = error.get("message")
+            if code == self.NOT_FOUND or message == "PersistedQueryNotFound":
+                codes.add(self.NOT_FOUND)
+            if code == self.NOT_SUPPORTED or message == "PersistedQueryNotSupported":
+                codes.add(self.NOT_SUPPORTED)
+        return codes
+
+
+registry = QueryRegistry()
+
+def send(request: Callable, auth, operation_name: str, query: str, variables: dict):
+    """
+    Sends a GraphQL operation using the shared registry. See `QueryRegistry.send`
+    """
+    return registry.send(request, auth, operation_name, query, variables)
@@ -1,8 +1,16 @@
 import requests
 import requests.packages
-from typing import Dict
+import json
+from requests.adapters import HTTPAdapter
+from typing import Dict, List
 from json import JSONDecodeError
+from email.utils import parsedate_to_datetime
+import gzip
+import random
+import threading
+from collections import deque
 import time
+import asyncio
 
 import settings
 import utils.log_handler as logger
@@ -11,19 +19,647 @@ log = logger.log
 from api.exceptions import *
 
 
+# JSON decoder used for response bodies. orjson is used when installed, unless `json_codec` in settings.py says otherwise
+if settings.json_codec in ("auto", "orjson"):
+    try:
+        import orjson
+        json_loads = orjson.loads
+        JSON_DECODE_ERRORS = (ValueError, JSONDecodeError, orjson.JSONDecodeError)
+    except ImportError:
+        if settings.json_codec == "orjson":
+            raise
+        json_loads = json.loads
+        JSON_DECODE_ERRORS = (ValueError, JSONDecodeError)
+else:
+    json_loads = json.loads
+    JSON_DECODE_ERRORS = (ValueError, JSONDecodeError)
+
+
 class PTWrapperLibraryResponse():
-    def __init__(self, response: requests.Response, status_code: int, message: str = '', json: dict = None):
+    """
+    Custom wrapper for a response from a PT instance.
+
+    When created with `content` instead of `json`, the body is only decoded the first time `json` or `has_json_response`
+    is accessed, so callers that only check `status_code` don't pay for decoding. The request handler only does this for
+    successful responses declared as JSON, anything else is decoded before the wrapper is created so a malformed body is
+    retried. A declared JSON body that doesn't decode raises `PTWrapperLibraryJSONResponse` on access, it is not retried
+    and doesn't count against the circuit breaker. Once decoded, the raw body is released from both this wrapper and the
+    underlying `response`, so only the decoded data is kept in memory.
+    """
+    def __init__(self, response: requests.Response, status_code: int, message: str = '', json: dict = None, content: bytes = None):
         self.response = response
         self.status_code = int(status_code)
         self.message = str(message)
 
-        self.has_json_response = True if json else False
-        self.json = json if json else {}
+        self._json = json
+        self._content = content
+        self._json_error = None
+        if content == None:
+            self._release_body()
+
+    def _release_body(self) -> None:
+        # the decoded data is all that's needed from here on, don't keep a second copy of the body alive
+        if isinstance(self.response, requests.Response):
+            self.response._content = None
+        elif hasattr(self.response, "_body"): # aiohttp.ClientResponse from the async transport
+            self.response._body = None
+
+    @property
+    def json(self) -> dict:
+        """
+        :raises PTWrapperLibraryJSONResponse: the body was declared as JSON but could not be decoded
+        :return: decoded response body, or an empty dict if the body was empty
+        :rtype: dict
+        """
+        if self._content != None:
+            try:
+                self._json = json_loads(self._content)
+            except JSON_DECODE_ERRORS as e:
+                log.exception(f'Bad JSON response, status_code={self.status_code}, message={e}')
+                self._json_error = e
+            self._content = None
+            self._release_body()
+        if self._json_error != None:
+            raise PTWrapperLibraryJSONResponse(f'Bad JSON response, status_code={self.status_code}') from self._json_error
+        return self._json if self._json else {}
+
+    @property
+    def has_json_response(self) -> bool:
+        return True if self.json else False
 
 if not settings.verify_ssl:
     # noinspection PyUnresolvedReferences
     requests.packages.urllib3.disable_warnings()
 
+
+# one keep-alive session per PT instance, shared by every request wrapper so repeated calls reuse pooled connections
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+def get_session(base_url: str) -> requests.Session:
+    """
+    Returns the pooled session used for all requests sent to `base_url`, creating it on first use.
+
+    The size of the connection pool is set with `connection_pool_size` in settings.py
+
+    :param base_url: URL to PT instance including protocol (ex. https://example.plextrac.com)
+    :type base_url: str
+    :return: session with a mounted connection pool for the instance
+    :rtype: requests.Session
+    """
+    with _sessions_lock:
+        session = _sessions.get(base_url)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.connection_pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[base_url] = session
+        return session
+
+def close_sessions() -> None:
+    """
+    Closes all pooled sessions and their open connections
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+# COMPRESSION
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+# instances that rejected a compressed request body, requests to these are sent uncompressed for the rest of the run
+_uncompressed_instances = set()
+
+def get_accept_encoding() -> str:
+    """
+    Returns the value for the `Accept-Encoding` header, based on `response_compression` in settings.py.
+    `br` is only included when a brotli decoder is installed.
+
+    :return: header value
+    :rtype: str
+    """
+    if not settings.response_compression:
+        return "identity"
+    encodings = [encoding for encoding in settings.response_compression if encoding != "br" or BROTLI_AVAILABLE]
+    return ", ".join(encodings) if len(encodings) > 0 else "identity"
+
+def encode_request_body(base_url: str, data: Dict) -> tuple:
+    """
+    Serializes a JSON request payload, gzip compressing it when `compress_request_bodies` is enabled in settings.py,
+    the payload is larger than `compress_request_min_bytes` and the instance hasn't rejected a compressed body before.
+
+    :param base_url: URL to PT instance including protocol (ex. https://example.plextrac.com)
+    :type base_url: str
+    :param data: request payload
+    :type data: Dict
+    :return: tuple of the encoded body, or None to send `data` as is, and a dict of headers to add to the request
+    :rtype: tuple[bytes, dict]
+    """
+    if not settings.compress_request_bodies or data == None or base_url in _uncompressed_instances:
+        return None, {}
+    body = json.dumps(data).encode("utf-8")
+    if len(body) < settings.compress_request_min_bytes:
+        return None, {}
+    return gzip.compress(body), {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+
+def handle_compression_rejected(base_url: str, status_code: int, compressed: bool) -> bool:
+    """
+    Checks whether the instance rejected a compressed request body. If it did, later requests to the instance are sent uncompressed.
+
+    :param base_url: URL to PT instance including protocol (ex. https://example.plextrac.com)
+    :type base_url: str
+    :param status_code: status code of the response
+    :type status_code: int
+    :param compressed: whether the request body was compressed
+    :type compressed: bool
+    :return: whether the request should be resent uncompressed
+    :rtype: bool
+    """
+    if compressed and status_code == 415:
+        log.warning(f'{base_url} does not support compressed request bodies, sending requests uncompressed')
+        _uncompressed_instances.add(base_url)
+        return True
+    return False
+
+
+class TokenBucket():
+    """
+    A class to pace requests to a sustained rate, while allowing short bursts.
+
+    The bucket holds up to `capacity` tokens and refills at `rate` tokens per second. Each request takes one token.
+    When the bucket is empty the token is borrowed against the refill, so requests are spaced `1/rate` seconds apart
+    in the order they reserved their token.
+    """
+    def __init__(self, rate: float, capacity: float):
+        """
+        :param rate: tokens added per second, the sustained number of requests per second
+        :type rate: float
+        :param capacity: max tokens held, the number of requests that can be sent at once after being idle
+        :type capacity: float
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Takes a token without waiting
+
+        :return: seconds to wait before sending the request the token was taken for
+        :rtype: float
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self) -> None:
+        """
+        Takes a token, blocking until the request it was taken for can be sent
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+GRAPHQL_BUCKET = "graphql"
+REST_BUCKET = "rest"
+
+# one token bucket per PT instance and kind of endpoint, shared by every request wrapper
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+def get_rate_limit_bucket(base_url: str, endpoint: str) -> TokenBucket:
+    """
+    Returns the token bucket that paces requests sent to `endpoint` on `base_url`, creating it on first use.
+    GraphQL requests (`/graphql`) and REST requests (`/api/v1`, `/api/v2`, etc.) use separate buckets.
+
+    Rates are set with the `rate_limit` settings in settings.py
+
+    :param base_url: URL to PT instance including protocol (ex. https://example.plextrac.com)
+    :type base_url: str
+    :param endpoint: endpoint the request will be sent to
+    :type endpoint: str
+    :return: token bucket for the instance and kind of endpoint, or None if requests to this kind of endpoint are not rate limited
+    :rtype: TokenBucket
+    """
+    bucket_type = GRAPHQL_BUCKET if endpoint.startswith("/graphql") else REST_BUCKET
+    if bucket_type == GRAPHQL_BUCKET:
+        rate, burst = settings.rate_limit_graphql_per_second, settings.rate_limit_graphql_burst
+    else:
+        rate, burst = settings.rate_limit_rest_per_second, settings.rate_limit_rest_burst
+    if not rate:
+        return None
+
+    key = f'{base_url}|{bucket_type}'
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket == None:
+            bucket = TokenBucket(rate, burst)
+            _buckets[key] = bucket
+        return bucket
+
+
+class ConcurrencyController():
+    """
+    A class to limit the number of requests in flight to a PT instance, adjusting the limit based on server feedback.
+
+    The limit follows additive increase, multiplicative decrease (AIMD). Each healthy response raises the limit by
+    `1/limit`, about 1 per round of requests. A 429 or 5xx response, a connection error, or a smoothed latency over
+    `latency_tolerance` times the baseline latency cuts the limit by `decrease_factor`. The limit is cut at
+    most once per `cooldown` seconds, so a burst of failures from the same round only counts once.
+
+    Latencies are tracked separately for each kind of request, since a batched query is always slower than a single one.
+    Only 2xx responses are sampled. The baseline is the fastest of the last `latency_window` samples, so a single
+    unusually fast response stops counting once it falls out of the window.
+
+    Threads wait for a slot with `acquire`, coroutines with `acquire_async`. Both share the same limit, so requests from
+    the async transport and from threads together never go over `max_limit`.
+    """
+    def __init__(self, initial_limit: int, min_limit: int, max_limit: int, latency_tolerance: float, decrease_factor: float = 0.5, cooldown: float = 1.0, latency_window: int = 100):
+        """
+        :param initial_limit: number of requests allowed in flight to start
+        :type initial_limit: int
+        :param min_limit: lowest the limit can be cut to
+        :type min_limit: int
+        :param max_limit: highest the limit can be raised to
+        :type max_limit: int
+        :param latency_tolerance: how many times slower than the baseline latency responses can get before cutting the limit
+        :type latency_tolerance: float
+        :param decrease_factor: multiplier applied to the limit when it is cut, defaults to 0.5
+        :type decrease_factor: float, optional
+        :param cooldown: min seconds between cuts to the limit, defaults to 1.0
+        :type cooldown: float, optional
+        :param latency_window: number of recent latencies of each kind of request the baseline is the fastest of, defaults to 100
+        :type latency_window: int, optional
+        """
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.latency_window = latency_window
+
+        self.in_flight = 0
+        self.recent_latencies: Dict[str, deque] = {}
+        self.smoothed_latency: Dict[str, float] = {}
+        self.last_decrease = 0
+        self.condition = threading.Condition()
+        # futures of coroutines waiting in `acquire_async`, with the event loop each belongs to
+        self.async_waiters: List[tuple] = []
+
+    def acquire(self) -> None:
+        """
+        Blocks until a request can be sent without going over the current limit
+        """
+        with self.condition:
+            while self.in_flight >= max(int(self.limit), self.min_limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self) -> None:
+        """
+        Waits until a request can be sent without going over the current limit, without blocking the event loop.
+        The waiting coroutine is woken up by `release` or `record` from any thread
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.condition:
+                if self.in_flight < max(int(self.limit), self.min_limit):
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self.async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            finally:
+                with self.condition:
+                    if (loop, waiter) in self.async_waiters:
+                        self.async_waiters.remove((loop, waiter))
+
+    def notify_async_waiters(self) -> None:
+        # the lock is held by the caller
+        for loop, waiter in self.async_waiters:
+            try:
+                loop.call_soon_threadsafe(wake_async_waiter, waiter)
+            except RuntimeError: # the event loop was closed while the coroutine was waiting
+                pass
+        self.async_waiters = []
+
+    def release(self, latency: float, status_code: int = None, latency_key: str = "") -> None:
+        """
+        Frees the slot taken with `acquire` or `acquire_async` and adjusts the limit based on the result of the request
+
+        :param latency: seconds the request took
+        :type latency: float
+        :param status_code: status code of the response, or None if no response was received, defaults to None
+        :type status_code: int, optional
+        :param latency_key: kind of request, latencies are only compared to requests of the same kind, defaults to ""
+        :type latency_key: str, optional
+        """
+        with self.condition:
+            self.in_flight -= 1
+            self.record(latency, status_code, latency_key)
+            self.condition.notify_all()
+
+    def record(self, latency: float, status_code: int = None, latency_key: str = "") -> None:
+        """
+        Adjusts the limit based on the result of a request. Callers that don't take a slot with `acquire` or
+        `acquire_async` use this to share feedback with the same controller.
+
+        :param latency: seconds the request took
+        :type latency: float
+        :param status_code: status code of the response, or None if no response was received, defaults to None
+        :type status_code: int, optional
+        :param latency_key: kind of request, latencies are only compared to requests of the same kind, defaults to ""
+        :type latency_key: str, optional
+        """
+        with self.condition:
+            overloaded = status_code == None or status_code == 429 or status_code >= 500
+            # only successful responses are compared, an error reply like a 4xx is often much faster than a real response
+            if not overloaded and 299 >= status_code >= 200:
+                recent_latencies = self.recent_latencies.setdefault(latency_key, deque(maxlen=self.latency_window))
+                recent_latencies.append(latency)
+                smoothed_latency = 0.8*self.smoothed_latency.get(latency_key, latency) + 0.2*latency
+                self.smoothed_latency[latency_key] = smoothed_latency
+                overloaded = smoothed_latency > self.latency_tolerance * max(min(recent_latencies), 0.001)
+
+            if overloaded:
+                now = time.time()
+                if now - self.last_decrease >= self.cooldown:
+                    self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+                    self.last_decrease = now
+                    # latencies seen before the cut no longer reflect the new load
+                    self.smoothed_latency.clear()
+                    log.debug(f'Server feedback shows overload, lowered concurrent request limit to {int(self.limit)}')
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1/self.limit)
+            self.condition.notify_all()
+            self.notify_async_waiters()
+
+def wake_async_waiter(waiter: asyncio.Future) -> None:
+    # a coroutine cancelled while waiting has already finished its future
+    if not waiter.done():
+        waiter.set_result(None)
+
+# one concurrency controller per PT instance, shared by every thread sending requests to that instance
+_controllers: Dict[str, ConcurrencyController] = {}
+_controllers_lock = threading.Lock()
+
+def get_concurrency_controller(base_url: str) -> ConcurrencyController:
+    """
+    Returns the concurrency controller for all requests sent to `base_url`, creating it on first use.
+
+    Limits are set with the `adaptive_concurrency` settings in settings.py
+
+    :param base_url: URL to PT instance including protocol (ex. https://example.plextrac.com)
+    :type base_url: str
+    :return: concurrency controller for the instance
+    :rtype: ConcurrencyController
+    """
+    with _controllers_lock:
+        controller = _controllers.get(base_url)
+        if controller == None:
+            controller = ConcurrencyController(
+                initial_limit=settings.adaptive_concurrency_initial_limit,
+                min_limit=settings.adaptive_concurrency_min_limit,
+                max_limit=settings.adaptive_concurrency_max_limit,
+                latency_tolerance=settings.adaptive_concurrency_latency_tolerance,
+                latency_window=settings.adaptive_concurrency_latency_window
+            )
+            _controllers[base_url] = controller
+        return controller
+
+
+class CircuitBreaker():
+    """
+    A class to stop sending requests to an endpoint that keeps failing, instead of waiting and retrying each one.
+
+    The circuit starts closed and requests are sent normally. After `failure_threshold` failed attempts in a row it
+    opens, and requests fail fast with `PTWrapperLibraryCircuitOpen` for `reset_timeout` seconds. After the timeout the
+    circuit is half-open and a single probe request is let through. If the probe succeeds the circuit closes,
+    otherwise it opens again for another `reset_timeout` seconds.
+
+    Only failures caused by the instance count: connection errors, retryable status codes and bad JSON.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        """
+        :param name: name of API endpoint, mentioned during exceptions
+        :type name: str
+        :param failure_threshold: number of failed attempts in a row that opens the circuit
+        :type failure_threshold: int
+        :param reset_timeout: seconds the circuit stays open before letting a probe request through
+        :type reset_timeout: float
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self.probe_in_flight = False
+        self.probe_count = 0
+        self.lock = threading.Lock()
+
+    def before_request(self) -> int:
+        """
+        Call before each attempt to send a request
+
+        :raises PTWrapperLibraryCircuitOpen: the circuit is open, or half-open with a probe already in flight
+        :return: id of the probe if this attempt is the probe request, pass it to `release_probe` once the attempt ends.
+        otherwise None
+        :rtype: int
+        """
+        with self.lock:
+            if self.state == self.OPEN and time.time() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == self.OPEN or (self.state == self.HALF_OPEN and self.probe_in_flight):
+                raise PTWrapperLibraryCircuitOpen(f'Circuit open, not sending request - {self.name}')
+            if self.state == self.HALF_OPEN:
+                self.probe_in_flight = True
+                self.probe_count += 1
+                log.info(f'Sending probe request to check if {self.name} has recovered')
+                return self.probe_count
+            return None
+
+    def release_probe(self, probe: int) -> None:
+        """
+        Call when an attempt ends. If the attempt was the probe and ended without recording a success or failure, such as
+        when it raised an unexpected exception, the next attempt is let through as the probe instead
+
+        :param probe: value returned from `before_request` for the attempt
+        :type probe: int
+        """
+        if probe == None:
+            return
+        with self.lock:
+            if self.state == self.HALF_OPEN and self.probe_in_flight and self.probe_count == probe:
+                self.probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self.lock:
+            if self.state != self.CLOSED:
+                log.success(f'{self.name} recovered, closing circuit')
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                log.warning(f'{self.name} failed {self.failures} time(s) in a row, opening circuit for {self.reset_timeout} sec(s)')
+                self.state = self.OPEN
+                self.opened_at = time.time()
+                self.probe_in_flight = False
+
+# one circuit breaker per PT instance and API endpoint name, shared by every request wrapper. an endpoint failing on one
+# instance doesn't open the circuit for the same endpoint on another instance
+_breakers: Dict[tuple, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(base_url: str, name: str) -> CircuitBreaker:
+    """
+    Returns the circuit breaker for requests to the API endpoint `name` on the instance `base_url`, creating it on first use.
+
+    Thresholds are set with the `circuit_breaker` settings in settings.py
+
+    :param base_url: URL to PT instance including protocol (ex. https://example.plextrac.com)
+    :type base_url: str
+    :param name: name of API endpoint passed to the request wrappers, e.g. "RunbookProcedureCreateV2"
+    :type name: str
+    :return: circuit breaker for the endpoint, or None if circuit breakers are disabled
+    :rtype: CircuitBreaker
+    """
+    if not settings.circuit_breaker_failure_threshold:
+        return None
+    with _breakers_lock:
+        breaker = _breakers.get((base_url, name))
+        if breaker == None:
+            breaker = CircuitBreaker(name, settings.circuit_breaker_failure_threshold, settings.circuit_breaker_reset_timeout)
+            _breakers[(base_url, name)] = breaker
+        return breaker
+
+
+class RetryPolicy():
+    """
+    A class to decide whether a failed request should be retried and how long to wait before retrying.
+
+    Failures are grouped into error classes that each have their own max number of retries. Waits use exponential
+    backoff with full jitter, a random time between 0 and `backoff_base * 2^attempt` capped at `backoff_max`, so
+    retries happen quickly when the instance recovers quickly and spread out when it doesn't.
+    """
+    CONNECT_ERROR = "connect_error" # request could not be sent or no response was received
+    BAD_JSON = "bad_json" # response status was successful but the body was not valid JSON
+    STATUS_CODE = "status_code" # response status was not in the 200-299 range
+    ERROR_CLASSES = [CONNECT_ERROR, BAD_JSON, STATUS_CODE]
+
+    def __init__(self, max_retries: Dict[str, int], retry_status_codes: List[int], backoff_base: float, backoff_max: float, retry_after_max: float):
+        """
+        :param max_retries: max number of retries for each error class
+        :type max_retries: Dict[str, int]
+        :param retry_status_codes: status codes that should be retried, other failed statuses are raised immediately
+        :type retry_status_codes: List[int]
+        :param backoff_base: seconds to wait before the first retry, doubles with each retry
+        :type backoff_base: float
+        :param backoff_max: max seconds to wait between retries
+        :type backoff_max: float
+        :param retry_after_max: max seconds to wait when the instance responds with a `Retry-After` header
+        :type retry_after_max: float
+        """
+        self.max_retries = max_retries
+        self.retry_status_codes = retry_status_codes
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+
+    def should_retry(self, error_class: str, retries: int, status_code: int = None) -> bool:
+        """
+        :param error_class: one of `ERROR_CLASSES`
+        :type error_class: str
+        :param retries: number of times this error class has already been retried for the request
+        :type retries: int
+        :param status_code: status code of the response for the `STATUS_CODE` error class, defaults to None
+        :type status_code: int, optional
+        :return: whether the request should be retried
+        :rtype: bool
+        """
+        if error_class == self.STATUS_CODE and status_code not in self.retry_status_codes:
+            return False
+        return retries < self.max_retries.get(error_class, 0)
+
+    def get_backoff(self, attempt: int, retry_after: float = None) -> float:
+        """
+        :param attempt: number of retries already done for the request, across all error classes
+        :type attempt: int
+        :param retry_after: seconds the instance asked to wait with a `Retry-After` header, defaults to None
+        :type retry_after: float, optional
+        :return: seconds to wait before retrying
+        :rtype: float
+        """
+        if retry_after != None:
+            return min(max(retry_after, 0), self.retry_after_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+def parse_retry_after(value: str) -> float:
+    """
+    Parses the value of a `Retry-After` header, which is either a number of seconds or an HTTP date
+
+    :param value: header value
+    :type value: str
+    :return: seconds to wait, or None if the value is missing or can't be parsed
+    :rtype: float
+    """
+    if value == None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+def get_max_retries(error_class_retries) -> int:
+    # per error class retry settings default to the general `retries` setting when set to None
+    return settings.retries if error_class_retries == None else error_class_retries
+
+retry_policy = RetryPolicy(
+    max_retries={
+        RetryPolicy.CONNECT_ERROR: get_max_retries(settings.connect_error_retries),
+        RetryPolicy.BAD_JSON: get_max_retries(settings.bad_json_retries),
+        RetryPolicy.STATUS_CODE: get_max_retries(settings.status_code_retries)
+    },
+    retry_status_codes=settings.retry_status_codes,
+    backoff_base=settings.retry_backoff_base,
+    backoff_max=settings.retry_backoff_max,
+    retry_after_max=settings.retry_after_max
+)
+
+
 def _do(http_method: str, base_url: str, headers: dict, endpoint: str, name: str, data: Dict = None, files = None) -> PTWrapperLibraryResponse:
     """
     :param http_method: HTTP method, GET, POST, PUT, DELETE
@@ -43,6 +679,7 @@ def _do(http_method: str, base_url: str, headers: dict, endpoint: str, name: str
     :raises PTWrapperLibraryException: general request failure
     :raises PTWrapperLibraryJSONResponse: request doesn't return JSON data
     :raises PTWrapperLibraryFailed: non 200 response
+    :raises PTWrapperLibraryCircuitOpen: too many requests to this endpoint failed recently, request was not sent
     :return: custom wrapper for Python requests.Response object
     :rtype: PTWrapperLibraryResponse
     """      
@@ -50,45 +687,109 @@ def _do(http_method: str, base_url: str, headers: dict, endpoint: str, name: str
     log_line_pre = f"method={http_method}, url={full_url}"
     log_line_post = ', '.join((log_line_pre, "success={}, status_code={}, message={}"))
     
-    retries = 0
-    while retries <= settings.retries:
-        # Log HTTP params and perform an HTTP request, catching and re-raising any exceptions
-        try:
-            log.debug(log_line_pre)
-            response = requests.request(method=http_method, url=full_url, verify=settings.verify_ssl, headers=headers, json=data, files=files)
-        except requests.exceptions.RequestException as e:
-            if retries < settings.retries:
-                retries += 1
-                log.exception(f'Request failed - {name}. Retrying... ({retries}/{settings.retries})\nException: {str(e)}')
-                time.sleep(5)
-                continue # if this part doesn't succeed you can't continue. prevents incrementing `retries` more than once in a single attempt
-            else:
-                raise PTWrapperLibraryException(f'Request failed - {name}') from e
-        # Deserialize JSON output to Python object, or return failed PTWrapperLibraryResponse on exception
-        try:
-            data_out = response.json()
-        except (ValueError, JSONDecodeError) as e:
-            if retries < settings.retries:
-                retries += 1
-                log.exception(log_line_post.format(False, None, e))
-                time.sleep(5)
-                continue # if this part doesn't succeed you can't continue. prevents incrementing `retries` more than once in a single attempt
-            else:
-                raise PTWrapperLibraryJSONResponse(f'Bad JSON response - {name}') from e
-        # If status_code in 200-299 range, return success PTWrapperLibraryResponse with data, otherwise raise exception
-        is_success = 299 >= response.status_code >= 200
-        log_line = log_line_post.format(is_success, response.status_code, response.reason)
-        if is_success:
+    session = get_session(base_url)
+    controller = get_concurrency_controller(base_url) if settings.adaptive_concurrency else None
+    latency_key = f'{name}:{data.get("operationName")}' if isinstance(data, dict) else name
+    bucket = get_rate_limit_bucket(base_url, endpoint)
+    breaker = get_circuit_breaker(base_url, name)
+    retries = {error_class: 0 for error_class in RetryPolicy.ERROR_CLASSES}
+    attempt = 0
+    probe = None
+    try:
+        while True:
+            # Log HTTP params and perform an HTTP request, catching and re-raising any exceptions
+            if breaker != None:
+                breaker.release_probe(probe)
+                probe = breaker.before_request()
+            if bucket != None:
+                bucket.acquire()
+            if controller != None:
+                controller.acquire()
+            body, body_headers = encode_request_body(base_url, data) if files == None else (None, {})
+            request_headers = dict(headers, **body_headers)
+            request_headers["Accept-Encoding"] = get_accept_encoding()
+            start_time = time.time()
+            status_code = None
+            request_error = None
+            try:
+                log.debug(log_line_pre)
+                if body != None:
+                    response = session.request(method=http_method, url=full_url, verify=settings.verify_ssl, headers=request_headers, data=body)
+                else:
+                    response = session.request(method=http_method, url=full_url, verify=settings.verify_ssl, headers=request_headers, json=data, files=files)
+                status_code = response.status_code
+            except requests.exceptions.RequestException as e:
+                request_error = e
+            finally:
+                if controller != None:
+                    controller.release(time.time() - start_time, status_code, latency_key)
+            if request_error != None:
+                if breaker != None:
+                    breaker.record_failure()
+                if retry_policy.should_retry(RetryPolicy.CONNECT_ERROR, retries[RetryPolicy.CONNECT_ERROR]):
+                    retries[RetryPolicy.CONNECT_ERROR] += 1
+                    log.exception(f'Request failed - {name}. Retrying... ({retries[RetryPolicy.CONNECT_ERROR]}/{retry_policy.max_retries[RetryPolicy.CONNECT_ERROR]})\nException: {str(request_error)}')
+                    time.sleep(retry_policy.get_backoff(attempt))
+                    attempt += 1
+                    continue # if this part doesn't succeed you can't continue. prevents incrementing `retries` more than once in a single attempt
+                else:
+                    raise PTWrapperLibraryException(f'Request failed - {name}') from request_error
+            # If status_code not in 200-299 range, retry if the status code is retryable, otherwise raise exception
+            is_success = 299 >= response.status_code >= 200
+            log_line = log_line_post.format(is_success, response.status_code, response.reason)
+            if not is_success:
+                if handle_compression_rejected(base_url, response.status_code, body != None):
+                    continue
+                if breaker != None:
+                    # client errors like 400 or 401 mean the instance is responding, they don't count against the circuit
+                    if response.status_code in retry_policy.retry_status_codes:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                if retry_policy.should_retry(RetryPolicy.STATUS_CODE, retries[RetryPolicy.STATUS_CODE], response.status_code):
+                    retries[RetryPolicy.STATUS_CODE] += 1
+                    log.exception(log_line)
+                    retry_after = None
+                    if response.status_code in (429, 503):
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    time.sleep(retry_policy.get_backoff(attempt, retry_after))
+                    attempt += 1
+                    continue # if this part doesn't succeed you can't continue. prevents incrementing `retries` more than once in a single attempt
+                else:
+                    try:
+                        pt_message = json_loads(response.content).get("message")
+                    except JSON_DECODE_ERRORS + (AttributeError,):
+                        pt_message = None
+                    log.exception(f'{log_line}, pt_message={pt_message}')
+                    raise PTWrapperLibraryFailed(f'{name} - {response.status_code}: {response.reason}')
+            # Bodies declared as JSON are decoded lazily by PTWrapperLibraryResponse. Anything else is decoded now, since an HTML
+            # error page from a proxy in front of the instance is a failure that should be retried
+            if "json" in response.headers.get("Content-Type", "").lower():
+                if breaker != None:
+                    breaker.record_success()
+                log.debug(log_line)
+                return PTWrapperLibraryResponse(response, response.status_code, message=response.reason, content=response.content)
+            try:
+                data_out = json_loads(response.content)
+            except JSON_DECODE_ERRORS as e:
+                if breaker != None:
+                    breaker.record_failure()
+                if retry_policy.should_retry(RetryPolicy.BAD_JSON, retries[RetryPolicy.BAD_JSON]):
+                    retries[RetryPolicy.BAD_JSON] += 1
+                    log.exception(log_line_post.format(False, response.status_code, e))
+                    time.sleep(retry_policy.get_backoff(attempt))
+                    attempt += 1
+                    continue # if this part doesn't succeed you can't continue. prevents incrementing `retries` more than once in a single attempt
+                else:
+                    raise PTWrapperLibraryJSONResponse(f'Bad JSON response - {name}') from e
+            if breaker != None:
+                breaker.record_success()
             log.debug(log_line)
             return PTWrapperLibraryResponse(response, response.status_code, message=response.reason, json=data_out)
-        if retries < settings.retries:
-            retries += 1
-            log.exception(log_line)
-            time.sleep(5)
-            continue # if this part doesn't succeed you can't continue. prevents incrementing `retries` more than once in a single attempt
-        else:
-            log.exception(f'{log_line}, pt_message={data_out.get("message")}')
-            raise PTWrapperLibraryFailed(f'{name} - {response.status_code}: {response.reason}')
+    finally:
+        # a probe that ended without recording a success or failure would keep the circuit half-open forever
+        if breaker != None:
+            breaker.release_probe(probe)
     
 def get(base_url: str, headers: dict, endpoint: str, name: str) -> PTWrapperLibraryResponse:
     """
@@ -0,0 +1,95 @@
+import gzip
+import json
+from typing import Iterable, Iterator, List, Tuple
+
+import utils.log_handler as logger
+log = logger.log
+
+
+SNAPSHOT_FORMAT = "runbook-repository-snapshot"
+SNAPSHOT_VERSION = 1
+
+
+def write_snapshot(file_path: str, repository: dict, procedures: Iterable[dict], instance_url: str = None, techniques: List[dict] = None) -> int:
+    """
+    Writes a repository and its procedures to a gzip compressed JSONL snapshot file.
+
+    The first line is a header with the repository and the ids of the procedures listed in it, each following line is
+    one procedure. Procedures are written as
+    they are taken from `procedures`, so a generator can be passed to write a snapshot of any size without holding
+    every procedure in memory.
+
+    :param file_path: path of the snapshot file, usually ending in .jsonl.gz
+    :type file_path: str
+    :param repository: repository object the procedures were loaded from
+    :type repository: repository object
+    :param procedures: variables for the POST RunbookProcedureCreateV2 endpoint returned from `format_procedure_detail`
+    :type procedures: Iterable[dict]
+    :param instance_url: url of the instance the procedures were loaded from, defaults to None
+    :type instance_url: str, optional
+    :param techniques: techniques on the instance the procedures were loaded from, used to match technique ids when
+    importing into a different instance, defaults to None
+    :type techniques: List[dict], optional
+    :return: number of procedures written
+    :rtype: int
+    """
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "repository": {
+            "id": repository.get("id"),
+            "name": repository.get("name"),
+            "shortName": repository.get("shortName"),
+            "description": repository.get("description"),
+            # procedures that could not be loaded are listed but not written, the procedure lines are the exported procedures
+            "procedures": [{"id": x["id"]} for x in repository.get("procedures") or []]
+        },
+        "instanceUrl": instance_url,
+        "techniques": techniques
+    }
+    count = 0
+    with gzip.open(file_path, 'wt', encoding='utf-8') as f:
+        f.write(json.dumps(header, separators=(',', ':')) + "\n")
+        for procedure in procedures:
+            f.write(json.dumps(procedure, separators=(',', ':')) + "\n")
+            count += 1
+    return count
+
+
+def read_snapshot(file_path: str) -> Tuple[dict, Iterator[dict]]:
+    """
+    Reads the header of a snapshot file written by `write_snapshot`, and returns it with an iterator that lazily yields
+    the procedures from the same open file, one line at a time. The file is closed once the iterator is exhausted.
+
+    :param file_path: path of the snapshot file
+    :type file_path: str
+    :raises Exception: the file is not a snapshot or was written by a newer version of the script
+    :return: the snapshot header, shaped like {"format": str, "version": int, "repository": {...}, "instanceUrl": str,
+    "techniques": [...]}, and an iterator of variables for the POST RunbookProcedureCreateV2 endpoint, in the order
+    they were written
+    :rtype: Tuple[dict, Iterator[dict]]
+    """
+    f = gzip.open(file_path, 'rt', encoding='utf-8')
+    try:
+        header = _parse_header(file_path, f.readline())
+    except Exception:
+        f.close()
+        raise
+    return header, _iter_procedures(f)
+
+
+def _parse_header(file_path: str, line: str) -> dict:
+    header = json.loads(line or "{}")
+    if header.get("format") != SNAPSHOT_FORMAT:
+        raise Exception(f'\'{file_path}\' is not a runbook repository snapshot')
+    if header.get("version", 0) > SNAPSHOT_VERSION:
+        raise Exception(f'Snapshot \'{file_path}\' has version {header.get("version")}, only version {SNAPSHOT_VERSION} and below are supported')
+    return header
+
+
+def _iter_procedures(f) -> Iterator[dict]:
+    with f:
+        for line in f:
+            if line.strip() == "":
+                continue
+            yield json.loads(line)
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+from typing import Dict, Iterable, List
+
+import utils.log_handler as logger
+log = logger.log
+
+
+class SyncState():
+    """
+    The state of a repository kept in sync with --sync, saved to an append-only JSONL file between runs.
+
+    Each line is one record:
+    - {"type": "sync", "source_repository": {"id": str, "name": str}, "target_repository_id": str, "source_instance_url": str,
+    "target_instance_url": str} the repository procedures are synced from and the repository they are synced to
+    - {"type": "synced", "source_id": str, "target_id": str, "updatedAt": str} a source procedure that was copied to the
+    target repository, `updatedAt` is the value the source procedure had when it was copied
+    - {"type": "deleted", "source_id": str} the copy of a source procedure that was deleted from the source repository
+    was deleted
+
+    Records are flushed as soon as they are written, so procedures synced before a run is stopped are not synced again.
+    `save` rewrites the file with one record per synced procedure, so it doesn't grow with every run. A source procedure
+    with a different `updatedAt` in the procedure list has changed since the last sync.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.source_repository: dict = None
+        self.target_repository_id: str = None
+        self.source_instance_url: str = None
+        self.target_instance_url: str = None
+        self.procedures: Dict[str, dict] = {}
+        # `updatedAt` of the source procedures listed in the current run, recorded once a procedure is synced
+        self.listed: Dict[str, str] = {}
+        self.file = None
+        self.lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.file_path)
+
+    def load(self) -> bool:
+        """
+        Loads the state from the state file. A partially written last line, left when the run was stopped mid write, is
+        ignored.
+
+        :return: whether the state file contained a repository that was synced before
+        :rtype: bool
+        """
+        if not self.exists():
+            return False
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip() == "":
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    log.warning(f'Ignoring unreadable line {line_number} in sync state \'{self.file_path}\'')
+                    continue
+                self._apply(record)
+        log.debug(f'Loaded sync state with {len(self.procedures)} synced procedures')
+        return self.source_repository != None and self.target_repository_id != None
+
+    def _apply(self, record: dict) -> None:
+        record_type = record.get("type")
+        if record_type == "sync":
+            self.source_repository = record["source_repository"]
+            self.target_repository_id = record["target_repository_id"]
+            self.source_instance_url = record.get("source_instance_url")
+            self.target_instance_url = record.get("target_instance_url")
+        elif record_type == "synced":
+            self.procedures[record["source_id"]] = {"target_id": record["target_id"], "updatedAt": record.get("updatedAt")}
+        elif record_type == "deleted":
+            self.procedures.pop(record["source_id"], None)
+
+    def _write(self, record: dict) -> None:
+        # the lock is held by the caller
+        if self.file == None:
+            self.file = open(self.file_path, 'a', encoding='utf-8')
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        self._apply(record)
+
+    def save(self) -> None:
+        """
+        Rewrites the state file with the current state. The state is written to a temporary file that then replaces the
+        state file, so the state file is never left partially written if the run is stopped while saving
+        """
+        with self.lock:
+            self.close_file()
+            temp_file_path = f'{self.file_path}.tmp'
+            with open(temp_file_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({
+                    "type": "sync",
+                    "source_repository": self.source_repository,
+                    "target_repository_id": self.target_repository_id,
+                    "source_instance_url": self.source_instance_url,
+                    "target_instance_url": self.target_instance_url
+                }) + "\n")
+                for source_id, synced in self.procedures.items():
+                    f.write(json.dumps({"type": "synced", "source_id": source_id, "target_id": synced["target_id"], "updatedAt": synced["updatedAt"]}) + "\n")
+            os.replace(temp_file_path, self.file_path)
+
+    def close_file(self) -> None:
+        # the lock is held by the caller
+        if self.file != None:
+            self.file.close()
+            self.file = None
+
+    def start(self, source_repository: dict, target_repository_id: str, source_instance_url: str = None, target_instance_url: str = None) -> None:
+        """
+        Starts the state of a new sync, replacing any previous state
+
+        :param source_repository: repository object procedures are synced from
+        :type source_repository: repository object
+        :param target_repository_id: id of the repository procedures are synced to
+        :type target_repository_id: str
+        :param source_instance_url: url of the instance the source repository is on, defaults to None
+        :type source_instance_url: str, optional
+        :param target_instance_url: url of the instance the target repository is on, defaults to None
+        :type target_instance_url: str, optional
+        """
+        with self.lock:
+            self.source_repository = {"id": source_repository["id"], "name": source_repository["name"]}
+            self.target_repository_id = target_repository_id
+            self.source_instance_url = source_instance_url
+            self.target_instance_url = target_instance_url
+            self.procedures = {}
+
+    def get_changes(self, procedure_ids: Iterable[str], listed_procedures: Iterable[dict]) -> tuple:
+        """
+        Compares the procedures in the source repository with the procedures synced by the previous run.
+
+        Which procedures are in the repository is decided by `procedure_ids`, the `procedures` of the repository. The
+        procedure list is only used for `updatedAt`. It is paginated, so a procedure can be missing from it if procedures
+        are created or deleted while it is loaded, a synced procedure missing from it is treated as unchanged.
+
+        :param procedure_ids: ids of the procedures in the source repository
+        :type procedure_ids: Iterable[str]
+        :param listed_procedures: procedure items returned from the POST RunbookProcedureListV2 endpoint
+        :type listed_procedures: Iterable[dict]
+        :return: procedure items that are new, procedure items that changed, and source ids of synced procedures that
+        were deleted from the source repository
+        :rtype: tuple[List[dict], List[dict], List[str]]
+        """
+        updated_at = {x['id']: x.get('updatedAt') for x in listed_procedures if x.get('deletedAt') == None}
+        new_procedures: List[dict] = []
+        changed_procedures: List[dict] = []
+        with self.lock:
+            self.listed = {}
+            for procedure_id in procedure_ids:
+                synced = self.procedures.get(procedure_id)
+                if synced == None:
+                    # a new procedure missing from the list is synced without an `updatedAt`, and updated by the next run
+                    self.listed[procedure_id] = updated_at.get(procedure_id)
+                    new_procedures.append({"id": procedure_id})
+                elif procedure_id in updated_at and synced.get('updatedAt') != updated_at[procedure_id]:
+                    self.listed[procedure_id] = updated_at[procedure_id]
+                    changed_procedures.append({"id": procedure_id})
+                else:
+                    self.listed[procedure_id] = synced.get('updatedAt')
+            deleted_ids = [x for x in self.procedures if x not in self.listed]
+        return new_procedures, changed_procedures, deleted_ids
+
+    def get_target_id(self, source_id: str) -> str:
+        synced = self.procedures.get(source_id)
+        return synced.get('target_id') if synced != None else None
+
+    def record_synced(self, source_id: str, target_id: str) -> None:
+        """
+        Records that a source procedure was copied to the target repository, as it was listed in the current run
+
+        :param source_id: id of the source procedure
+        :type source_id: str
+        :param target_id: id of the copy of the procedure in the target repository
+        :type target_id: str
+        """
+        with self.lock:
+            self._write({"type": "synced", "source_id": source_id, "target_id": target_id, "updatedAt": self.listed.get(source_id)})
+
+    def record_deleted(self, source_id: str) -> None:
+        with self.lock:
+            self._write({"type": "deleted", "source_id": source_id})
+
+    def close(self) -> None:
+        with self.lock:
+            self.close_file()
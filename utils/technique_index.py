@@ -0,0 +1,73 @@
+import threading
+from typing import Dict, Iterable, List
+
+import utils.log_handler as logger
+log = logger.log
+
+
+def get_technique_keys(technique: dict) -> List[tuple]:
+    """
+    Gets the keys a technique is matched on between instances, from most to least specific. Technique ids are
+    different on each instance, but the same technique has the same shortName and name, e.g. "T1647" and
+    "Plist File Modification". The same technique can be listed under several methodologies, so the methodologies
+    are part of the most specific key.
+
+    :param technique: technique object returned from the POST RunbookTechniqueListV2 endpoint
+    :type technique: dict
+    :return: list of keys for the technique
+    :rtype: List[tuple]
+    """
+    methodologies = tuple(sorted([x.get('shortName') or x.get('name') or "" for x in technique.get('methodologies') or []]))
+    return [
+        (technique.get('shortName'), technique.get('name'), methodologies),
+        (technique.get('shortName'), technique.get('name')),
+        (technique.get('shortName'),)
+    ]
+
+
+class TechniqueRemap():
+    """
+    Maps the technique ids of one instance to the ids of the same techniques on another instance.
+
+    The mapping is built once from the full technique list of each instance. Each source technique is matched to the
+    target technique with the same key from `get_technique_keys`, trying the most specific key first. A key is only
+    used if it matches a single target technique. Remapping a technique id is then a single dict lookup.
+    """
+
+    def __init__(self, source_techniques: Iterable[dict], target_techniques: Iterable[dict]):
+        target_index: Dict[tuple, str] = {}
+        for technique in target_techniques:
+            for key in get_technique_keys(technique):
+                # keys shared by several target techniques are ambiguous and never matched
+                target_index[key] = technique['id'] if key not in target_index else None
+
+        self.mapping: Dict[str, str] = {}
+        self.source_count = 0
+        for technique in source_techniques:
+            self.source_count += 1
+            for key in get_technique_keys(technique):
+                if target_index.get(key) != None:
+                    self.mapping[technique['id']] = target_index[key]
+                    break
+        self.unmatched = set()
+        self.lock = threading.Lock()
+
+    def remap(self, technique_ids: List[str]) -> List[str]:
+        """
+        :param technique_ids: technique ids on the source instance
+        :type technique_ids: List[str]
+        :return: ids of the same techniques on the target instance. techniques without a match are left out, since
+        creating a procedure with a technique id that does not exist on the instance fails
+        :rtype: List[str]
+        """
+        remapped = []
+        for technique_id in technique_ids:
+            target_id = self.mapping.get(technique_id)
+            if target_id == None:
+                with self.lock:
+                    if technique_id not in self.unmatched:
+                        self.unmatched.add(technique_id)
+                        log.warning(f'Could not find technique \'{technique_id}\' on the target instance, procedures using it are created without it')
+                continue
+            remapped.append(target_id)
+        return remapped